@@ -1,455 +1,785 @@
-
-"""
-FRIDAY - Offline AI Assistant
-Desktop GUI application module for the FRIDAY assistant
-"""
-
-import os
-import sys
-import time
-import threading
-import tkinter as tk
-from tkinter import ttk, scrolledtext, filedialog, messagebox
-from PIL import Image, ImageTk, ImageDraw
-import pyautogui
-from datetime import datetime
-
-# Import the core module
-from friday_core import FridayCore
-
-
-class FridayApp:
-    """
-    Desktop GUI application for FRIDAY AI Assistant
-    """
-    
-    def __init__(self, root):
-        """Initialize the FRIDAY app interface"""
-        self.root = root
-        self.root.title("FRIDAY - Offline AI Assistant")
-        self.root.geometry("900x600")
-        self.root.minsize(800, 500)
-        
-        # Set theme colors
-        self.bg_color = "#1e1e2e"  # Dark background
-        self.text_color = "#cdd6f4"  # Light text
-        self.accent_color = "#f38ba8"  # Pink accent
-        self.input_bg = "#313244"  # Darker input background
-        self.send_button_color = "#cba6f7"  # Purple button
-        
-        # Configure root window
-        self.root.configure(bg=self.bg_color)
-        
-        # Initialize FRIDAY core
-        self.friday = FridayCore()
-        
-        # Voice listening status
-        self.voice_active = False
-        self.voice_thread = None
-        
-        # Create GUI elements
-        self.create_gui()
-        
-        # Set up closing protocol
-        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
-        
-        # Initial greeting
-        self.display_assistant_message("Hello! I'm FRIDAY, your offline AI assistant. How can I help you today?")
-
-    def create_gui(self):
-        """Create all GUI elements"""
-        # Main frame to hold all elements
-        main_frame = tk.Frame(self.root, bg=self.bg_color)
-        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        
-        # Top bar with title and controls
-        self.create_top_bar(main_frame)
-        
-        # Chat display area
-        self.create_chat_area(main_frame)
-        
-        # Input area
-        self.create_input_area(main_frame)
-        
-        # Status bar
-        self.create_status_bar(main_frame)
-
-    def create_top_bar(self, parent):
-        """Create top bar with title and controls"""
-        top_frame = tk.Frame(parent, bg=self.bg_color)
-        top_frame.pack(fill=tk.X, pady=5)
-        
-        # Title
-        title_label = tk.Label(
-            top_frame, 
-            text="FRIDAY AI Assistant", 
-            font=("Arial", 16, "bold"),
-            fg=self.accent_color,
-            bg=self.bg_color
-        )
-        title_label.pack(side=tk.LEFT, padx=10)
-        
-        # Voice button
-        self.voice_button = tk.Button(
-            top_frame,
-            text="🎤 Voice: OFF",
-            command=self.toggle_voice,
-            bg=self.input_bg,
-            fg=self.text_color,
-            relief=tk.RAISED,
-            padx=10
-        )
-        self.voice_button.pack(side=tk.RIGHT, padx=5)
-        
-        # Privacy mode button
-        self.privacy_button = tk.Button(
-            top_frame,
-            text="🔒 Privacy Mode",
-            command=self.toggle_privacy,
-            bg=self.input_bg,
-            fg=self.text_color,
-            relief=tk.RAISED,
-            padx=10
-        )
-        self.privacy_button.pack(side=tk.RIGHT, padx=5)
-        
-        # Save button
-        save_button = tk.Button(
-            top_frame,
-            text="💾 Save Chat",
-            command=self.save_chat,
-            bg=self.input_bg,
-            fg=self.text_color,
-            relief=tk.RAISED,
-            padx=10
-        )
-        save_button.pack(side=tk.RIGHT, padx=5)
-        
-        # Load button
-        load_button = tk.Button(
-            top_frame,
-            text="📂 Load Chat",
-            command=self.load_chat,
-            bg=self.input_bg,
-            fg=self.text_color,
-            relief=tk.RAISED,
-            padx=10
-        )
-        load_button.pack(side=tk.RIGHT, padx=5)
-
-    def create_chat_area(self, parent):
-        """Create the chat display area"""
-        # Chat frame with custom styling
-        chat_frame = tk.Frame(parent, bg=self.bg_color)
-        chat_frame.pack(fill=tk.BOTH, expand=True, pady=10)
-        
-        # Create scrolled text widget
-        self.chat_display = scrolledtext.ScrolledText(
-            chat_frame,
-            wrap=tk.WORD,
-            font=("Arial", 11),
-            bg=self.input_bg,
-            fg=self.text_color,
-            insertbackground=self.text_color,
-            relief=tk.FLAT,
-            padx=10,
-            pady=10
-        )
-        self.chat_display.pack(fill=tk.BOTH, expand=True)
-        self.chat_display.config(state=tk.DISABLED)  # Make read-only
-
-    def create_input_area(self, parent):
-        """Create the user input area"""
-        input_frame = tk.Frame(parent, bg=self.bg_color)
-        input_frame.pack(fill=tk.X, pady=10)
-        
-        # User input field
-        self.user_input = tk.Entry(
-            input_frame,
-            font=("Arial", 12),
-            bg=self.input_bg,
-            fg=self.text_color,
-            insertbackground=self.text_color,
-            relief=tk.FLAT
-        )
-        self.user_input.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, ipady=8)
-        self.user_input.bind("<Return>", lambda event: self.send_message())
-        self.user_input.focus_set()
-        
-        # Send button
-        send_button = tk.Button(
-            input_frame,
-            text="Send",
-            command=self.send_message,
-            bg=self.send_button_color,
-            fg="#000000",
-            font=("Arial", 11, "bold"),
-            relief=tk.RAISED,
-            padx=15,
-            pady=5
-        )
-        send_button.pack(side=tk.RIGHT, padx=5)
-
-    def create_status_bar(self, parent):
-        """Create status bar at bottom"""
-        status_frame = tk.Frame(parent, bg=self.input_bg, height=25)
-        status_frame.pack(fill=tk.X, side=tk.BOTTOM)
-        
-        # Status label
-        self.status_label = tk.Label(
-            status_frame,
-            text="Ready",
-            bg=self.input_bg,
-            fg=self.text_color,
-            anchor=tk.W,
-            padx=10
-        )
-        self.status_label.pack(side=tk.LEFT, fill=tk.X)
-        
-        # Model info
-        model_label = tk.Label(
-            status_frame,
-            text=f"Model: {self.friday.model_name}",
-            bg=self.input_bg,
-            fg=self.text_color,
-            anchor=tk.E,
-            padx=10
-        )
-        model_label.pack(side=tk.RIGHT)
-
-    def send_message(self):
-        """Process and send user message"""
-        user_message = self.user_input.get().strip()
-        if not user_message:
-            return
-            
-        # Clear input field
-        self.user_input.delete(0, tk.END)
-        
-        # Display user message
-        self.display_user_message(user_message)
-        
-        # Update status
-        self.update_status("Processing...")
-        
-        # Use a thread to prevent UI freezing
-        threading.Thread(target=self.process_message_thread, args=(user_message,), daemon=True).start()
-
-    def process_message_thread(self, user_message):
-        """Process message in background thread"""
-        try:
-            # Get response from FRIDAY core
-            response = self.friday.process_text_input(user_message)
-            
-            # Display response
-            self.root.after(0, lambda: self.display_assistant_message(response))
-            
-            # Try to speak the response if voice is active
-            if self.voice_active and not self.friday.privacy_mode:
-                self.friday.speak(response)
-                
-            # Update status
-            self.root.after(0, lambda: self.update_status("Ready"))
-            
-        except Exception as e:
-            error_msg = f"Error processing message: {str(e)}"
-            self.root.after(0, lambda: self.display_system_message(error_msg))
-            self.root.after(0, lambda: self.update_status("Error occurred"))
-
-    def display_user_message(self, message):
-        """Display user message in chat"""
-        self.chat_display.config(state=tk.NORMAL)
-        
-        # Add timestamp
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.chat_display.insert(tk.END, f"[{timestamp}] ", "timestamp")
-        
-        # Add user message
-        self.chat_display.insert(tk.END, "You: ", "user_label")
-        self.chat_display.insert(tk.END, f"{message}\n\n", "user_message")
-        
-        # Apply tags for styling
-        self.chat_display.tag_config("timestamp", foreground="#888888")
-        self.chat_display.tag_config("user_label", foreground="#89dceb", font=("Arial", 11, "bold"))
-        self.chat_display.tag_config("user_message", foreground=self.text_color)
-        
-        self.chat_display.config(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
-
-    def display_assistant_message(self, message):
-        """Display assistant message in chat"""
-        self.chat_display.config(state=tk.NORMAL)
-        
-        # Add timestamp
-        timestamp = datetime.now().strftime("%H:%M:%S")
-        self.chat_display.insert(tk.END, f"[{timestamp}] ", "timestamp")
-        
-        # Add assistant message
-        self.chat_display.insert(tk.END, "FRIDAY: ", "assistant_label")
-        self.chat_display.insert(tk.END, f"{message}\n\n", "assistant_message")
-        
-        # Apply tags for styling
-        self.chat_display.tag_config("timestamp", foreground="#888888")
-        self.chat_display.tag_config("assistant_label", foreground=self.accent_color, font=("Arial", 11, "bold"))
-        self.chat_display.tag_config("assistant_message", foreground=self.text_color)
-        
-        self.chat_display.config(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
-
-    def display_system_message(self, message):
-        """Display system message in chat"""
-        self.chat_display.config(state=tk.NORMAL)
-        
-        # Add system message
-        self.chat_display.insert(tk.END, "System: ", "system_label")
-        self.chat_display.insert(tk.END, f"{message}\n\n", "system_message")
-        
-        # Apply tags for styling
-        self.chat_display.tag_config("system_label", foreground="#f9e2af", font=("Arial", 11, "bold"))
-        self.chat_display.tag_config("system_message", foreground="#f9e2af")
-        
-        self.chat_display.config(state=tk.DISABLED)
-        self.chat_display.see(tk.END)
-
-    def update_status(self, message):
-        """Update status bar message"""
-        self.status_label.config(text=message)
-
-    def toggle_voice(self):
-        """Toggle voice recognition on/off"""
-        if self.voice_active:
-            # Turn off voice
-            self.voice_active = False
-            self.voice_button.config(text="🎤 Voice: OFF")
-            self.update_status("Voice recognition deactivated")
-            # Stop the voice thread
-            if self.voice_thread and self.voice_thread.is_alive():
-                self.friday.should_stop = True
-                self.voice_thread.join(timeout=1)
-        else:
-            # Turn on voice
-            self.voice_active = True
-            self.voice_button.config(text="🎤 Voice: ON")
-            self.update_status("Voice recognition activated")
-            self.display_system_message("Voice recognition activated. Say 'Hey FRIDAY' to get my attention.")
-            
-            # Start voice thread
-            self.friday.should_stop = False
-            self.voice_thread = threading.Thread(target=self.voice_listen_thread, daemon=True)
-            self.voice_thread.start()
-
-    def voice_listen_thread(self):
-        """Background thread for voice recognition"""
-        # Reset stop flag
-        self.friday.should_stop = False
-        
-        # Start listening
-        try:
-            self.friday.listen()
-        except Exception as e:
-            self.root.after(0, lambda: self.display_system_message(f"Voice error: {str(e)}"))
-            self.root.after(0, lambda: self.toggle_voice())  # Turn off voice on error
-            
-        # Update button if thread exits
-        if self.voice_active:
-            self.root.after(0, lambda: self.toggle_voice())
-
-    def toggle_privacy(self):
-        """Toggle privacy mode"""
-        self.friday.toggle_privacy()
-        privacy_status = "ON" if self.friday.privacy_mode else "OFF"
-        privacy_icon = "🔐" if self.friday.privacy_mode else "🔒"
-        
-        self.privacy_button.config(text=f"{privacy_icon} Privacy: {privacy_status}")
-        self.display_system_message(f"Privacy mode: {privacy_status}")
-
-    def save_chat(self):
-        """Save chat history to file"""
-        try:
-            file_path = filedialog.asksaveasfilename(
-                defaultextension=".json",
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
-                title="Save Chat History"
-            )
-            
-            if not file_path:
-                return
-                
-            success = self.friday.save_conversation(file_path)
-            
-            if success:
-                self.display_system_message(f"Chat history saved to {file_path}")
-            else:
-                self.display_system_message("Failed to save chat history")
-                
-        except Exception as e:
-            self.display_system_message(f"Error saving chat: {str(e)}")
-
-    def load_chat(self):
-        """Load chat history from file"""
-        try:
-            file_path = filedialog.askopenfilename(
-                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
-                title="Load Chat History"
-            )
-            
-            if not file_path:
-                return
-                
-            success = self.friday.load_conversation(file_path)
-            
-            if success:
-                # Clear chat display
-                self.chat_display.config(state=tk.NORMAL)
-                self.chat_display.delete(1.0, tk.END)
-                self.chat_display.config(state=tk.DISABLED)
-                
-                # Reload conversation from history
-                for message in self.friday.conversation_history:
-                    if message["role"] == "user":
-                        self.display_user_message(message["content"])
-                    else:
-                        self.display_assistant_message(message["content"])
-                        
-                self.display_system_message(f"Chat history loaded from {file_path}")
-            else:
-                self.display_system_message("Failed to load chat history")
-                
-        except Exception as e:
-            self.display_system_message(f"Error loading chat: {str(e)}")
-
-    def on_closing(self):
-        """Handle window closing"""
-        # Stop voice thread if running
-        if self.voice_active:
-            self.friday.should_stop = True
-            if self.voice_thread and self.voice_thread.is_alive():
-                self.voice_thread.join(timeout=1)
-        
-        # Ask user to confirm exit
-        if messagebox.askokcancel("Quit", "Do you want to quit FRIDAY?"):
-            self.root.destroy()
-            sys.exit(0)
-
-
-# Main function to start the app
-def main():
-    # Create tkinter root
-    root = tk.Tk()
-    
-    # Set window icon (if available)
-    try:
-        # Set taskbar icon (Windows)
-        import ctypes
-        myappid = 'ai.friday.assistant.1.0'  # arbitrary string
-        ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
-    except:
-        pass
-    
-    # Create and run app
-    app = FridayApp(root)
-    root.mainloop()
-
-
-if __name__ == "__main__":
+
+"""
+FRIDAY - Offline AI Assistant
+Desktop GUI application module for the FRIDAY assistant
+"""
+
+import re
+import sys
+import time
+import queue
+import threading
+from collections import deque
+from functools import partial
+import tkinter as tk
+from tkinter import ttk, scrolledtext, filedialog, messagebox
+
+# Import the core module
+from friday_core import FridayCore
+
+# Cap on lines kept in the chat widget; the full conversation is still
+# retained in FridayCore.conversation_history for save/export
+MAX_CHAT_LINES = 2000
+
+# Paged rendering of loaded histories: materialize only the newest
+# messages up front and prepend older pages as the user scrolls up
+INITIAL_RENDER_MESSAGES = 200
+OLDER_PAGE_SIZE = 50
+
+# Sentence-boundary detection for streamed responses, compiled once so
+# the per-token check skips the re-module cache lookup
+_SENT_END_RE = re.compile(r'[.!?]["\')\]]?\s*$')
+_ABBREV_RE = re.compile(r'\b(?:Dr|Mr|Mrs|Ms|PM|AM|etc|vs|Fig)\.\s*$')
+
+
+class FridayApp:
+    """
+    Desktop GUI application for FRIDAY AI Assistant
+    """
+    
+    def __init__(self, root):
+        """Initialize the FRIDAY app interface"""
+        self.root = root
+        self.root.title("FRIDAY - Offline AI Assistant")
+        self.root.geometry("900x600")
+        self.root.minsize(800, 500)
+        
+        # Set theme colors
+        self.bg_color = "#1e1e2e"  # Dark background
+        self.text_color = "#cdd6f4"  # Light text
+        self.accent_color = "#f38ba8"  # Pink accent
+        self.input_bg = "#313244"  # Darker input background
+        self.send_button_color = "#cba6f7"  # Purple button
+        
+        # Configure root window
+        self.root.configure(bg=self.bg_color)
+
+        # Themed button styles; ttk's theme engine batches repaints so a
+        # text change on one button doesn't redraw its neighbours
+        style = ttk.Style(self.root)
+        style.configure('Friday.TButton',
+                        background=self.input_bg,
+                        foreground=self.text_color,
+                        padding=5)
+        style.configure('FridaySend.TButton',
+                        background=self.send_button_color,
+                        foreground="#000000",
+                        font=("Arial", 11, "bold"),
+                        padding=5)
+        
+        # Initialize FRIDAY core
+        self.friday = FridayCore()
+        
+        # Voice listening status
+        self.voice_active = False
+        self.voice_thread = None
+
+        # Coalesced UI updates from worker threads
+        self._ui_queue = deque()
+        self._pending_ui = None
+
+        # Timestamp prefix cache, keyed on the current second
+        self._ts_cache_second = -1
+        self._ts_cache_prefix = ""
+
+        # Pending autoscroll flag for the see(END) throttle
+        self._see_pending = False
+
+        # Index into conversation_history of the oldest rendered message
+        self._visible_start_idx = 0
+
+        # Messages held back while the user is scrolled up reading
+        # history; flushed in one batch on return to the bottom
+        self._pending_messages = []
+
+        # Sentence-level TTS pipeline: synthesis of one sentence overlaps
+        # generation of the next
+        self._tts_queue = queue.Queue(maxsize=8)
+        self._tts_cancel = threading.Event()
+        threading.Thread(target=self._tts_worker, daemon=True).start()
+
+        # Persistent worker thread for message processing; avoids spawning
+        # a thread per message and serializes access to FridayCore state
+        self._msg_queue = queue.Queue()
+        self._worker = threading.Thread(target=self._message_worker, daemon=True)
+        self._worker.start()
+        
+        # Create GUI elements
+        self.create_gui()
+        
+        # Set up closing protocol
+        self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        
+        # Initial greeting
+        self.display_assistant_message("Hello! I'm FRIDAY, your offline AI assistant. How can I help you today?")
+
+    def create_gui(self):
+        """Create all GUI elements"""
+        # Main frame to hold all elements
+        main_frame = tk.Frame(self.root, bg=self.bg_color)
+        main_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # Top bar with title and controls
+        self.create_top_bar(main_frame)
+        
+        # Chat display area
+        self.create_chat_area(main_frame)
+        
+        # Input area
+        self.create_input_area(main_frame)
+        
+        # Status bar
+        self.create_status_bar(main_frame)
+
+    def create_top_bar(self, parent):
+        """Create top bar with title and controls"""
+        top_frame = tk.Frame(parent, bg=self.bg_color)
+        top_frame.pack(fill=tk.X, pady=5)
+        
+        # Title
+        title_label = tk.Label(
+            top_frame, 
+            text="FRIDAY AI Assistant", 
+            font=("Arial", 16, "bold"),
+            fg=self.accent_color,
+            bg=self.bg_color
+        )
+        title_label.pack(side=tk.LEFT, padx=10)
+        
+        # Voice button
+        self.voice_button = ttk.Button(
+            top_frame,
+            text="🎤 Voice: OFF",
+            command=self.toggle_voice,
+            style='Friday.TButton'
+        )
+        self.voice_button.pack(side=tk.RIGHT, padx=5)
+        
+        # Privacy mode button
+        self.privacy_button = ttk.Button(
+            top_frame,
+            text="🔒 Privacy Mode",
+            command=self.toggle_privacy,
+            style='Friday.TButton'
+        )
+        self.privacy_button.pack(side=tk.RIGHT, padx=5)
+        
+        # Save button
+        save_button = ttk.Button(
+            top_frame,
+            text="💾 Save Chat",
+            command=self.save_chat,
+            style='Friday.TButton'
+        )
+        save_button.pack(side=tk.RIGHT, padx=5)
+        
+        # Load button
+        load_button = ttk.Button(
+            top_frame,
+            text="📂 Load Chat",
+            command=self.load_chat,
+            style='Friday.TButton'
+        )
+        load_button.pack(side=tk.RIGHT, padx=5)
+
+    def create_chat_area(self, parent):
+        """Create the chat display area"""
+        # Chat frame with custom styling
+        chat_frame = tk.Frame(parent, bg=self.bg_color)
+        chat_frame.pack(fill=tk.BOTH, expand=True, pady=10)
+        
+        # Create scrolled text widget
+        self.chat_display = scrolledtext.ScrolledText(
+            chat_frame,
+            wrap=tk.WORD,
+            font=("Arial", 11),
+            bg=self.input_bg,
+            fg=self.text_color,
+            insertbackground=self.text_color,
+            relief=tk.FLAT,
+            padx=10,
+            pady=10
+        )
+        self.chat_display.pack(fill=tk.BOTH, expand=True)
+        self.chat_display.config(state=tk.DISABLED)  # Make read-only
+
+        # Configure message tags once; styling never changes at runtime so
+        # there is no need to re-issue tag_config on every insertion
+        self.chat_display.tag_config("timestamp", foreground="#888888")
+        self.chat_display.tag_config("user_label", foreground="#89dceb", font=("Arial", 11, "bold"))
+        self.chat_display.tag_config("user_message", foreground=self.text_color)
+        self.chat_display.tag_config("assistant_label", foreground=self.accent_color, font=("Arial", 11, "bold"))
+        self.chat_display.tag_config("assistant_message", foreground=self.text_color)
+        self.chat_display.tag_config("system_label", foreground="#f9e2af", font=("Arial", 11, "bold"))
+        self.chat_display.tag_config("system_message", foreground="#f9e2af")
+
+        # Lazily page in older history when the user scrolls near the
+        # top, and flush deferred messages on return to the bottom. X11
+        # reports wheel-down as Button-5, and dragging the scrollbar
+        # fires no wheel event at all, so the scroll position itself is
+        # watched through yscrollcommand as well.
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>", "<Prior>", "<Next>"):
+            self.chat_display.bind(seq, self._on_chat_scroll)
+        self._scroll_probe_armed = False
+        self.chat_display.config(yscrollcommand=self._on_scroll_position)
+
+    def _on_scroll_position(self, first, last):
+        """yscrollcommand hook: update the scrollbar, then probe once idle"""
+        self.chat_display.vbar.set(first, last)
+        # Coalesce to one probe per event-loop turn; probing from inside
+        # the insert that moved the view would recurse
+        if not self._scroll_probe_armed:
+            self._scroll_probe_armed = True
+            self.root.after_idle(self._scroll_probe)
+
+    def _scroll_probe(self):
+        self._scroll_probe_armed = False
+        self._on_chat_scroll()
+
+    def _on_chat_scroll(self, event=None):
+        """Prepend an older page of history when scrolled near the top"""
+        if self._visible_start_idx > 0 and self.chat_display.yview()[0] < 0.05:
+            self._load_older_page(OLDER_PAGE_SIZE)
+        elif self._pending_messages and not self._scrolled_away():
+            self._flush_pending_messages()
+
+    def _scrolled_away(self):
+        """True while the user has scrolled up away from the bottom"""
+        return self.chat_display.yview()[1] < 0.95
+
+    def _defer_message(self, role, message):
+        """Hold back an incoming message while the user reads history
+
+        Off-screen updates cost Tk work and would drag the viewport;
+        deferred messages are batched in on return to the bottom. Returns
+        True when the message was queued.
+        """
+        if not self._scrolled_away():
+            return False
+        self._pending_messages.append((role, message))
+        self.update_status(f"{len(self._pending_messages)} new message(s) below")
+        return True
+
+    def _flush_pending_messages(self):
+        """Render all deferred messages with one batched insert"""
+        if not self._pending_messages:
+            return
+
+        args = []
+        timestamp = self._timestamp_prefix()
+        tag_map = {
+            "user": ("You: ", "user_label", "user_message"),
+            "assistant": ("FRIDAY: ", "assistant_label", "assistant_message"),
+            "system": ("System: ", "system_label", "system_message"),
+        }
+        for role, message in self._pending_messages:
+            label, label_tag, msg_tag = tag_map[role]
+            if role != "system":
+                args.extend([timestamp, "timestamp"])
+            args.extend([label, label_tag, f"{message}\n\n", msg_tag])
+        self._pending_messages.clear()
+
+        self.chat_display.config(state=tk.NORMAL)
+        self.chat_display.insert(tk.END, *args)
+        self._trim_chat_display()
+        self.chat_display.config(state=tk.DISABLED)
+        self.chat_display.see(tk.END)
+        self.update_status("Ready")
+
+    def _load_older_page(self, count):
+        """Materialize the next `count` older messages above the viewport"""
+        new_start = max(0, self._visible_start_idx - count)
+        if new_start == self._visible_start_idx:
+            return
+
+        history = list(self.friday.conversation_history)
+        args = self._history_insert_args(history[new_start:self._visible_start_idx])
+        self._visible_start_idx = new_start
+
+        self.chat_display.config(state=tk.NORMAL)
+        self.chat_display.insert('1.0', *args)
+        self.chat_display.config(state=tk.DISABLED)
+
+    def _history_insert_args(self, messages):
+        """Build the interleaved (text, tag) insert arguments for messages"""
+        args = []
+        timestamp = self._timestamp_prefix()
+        for message in messages:
+            if message["role"] == "user":
+                label, label_tag, msg_tag = "You: ", "user_label", "user_message"
+            else:
+                label, label_tag, msg_tag = "FRIDAY: ", "assistant_label", "assistant_message"
+            args.extend([
+                timestamp, "timestamp",
+                label, label_tag,
+                f"{message['content']}\n\n", msg_tag,
+            ])
+        return args
+
+    def create_input_area(self, parent):
+        """Create the user input area"""
+        input_frame = tk.Frame(parent, bg=self.bg_color)
+        input_frame.pack(fill=tk.X, pady=10)
+        
+        # User input field
+        self.user_input = tk.Entry(
+            input_frame,
+            font=("Arial", 12),
+            bg=self.input_bg,
+            fg=self.text_color,
+            insertbackground=self.text_color,
+            relief=tk.FLAT
+        )
+        self.user_input.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, ipady=8)
+        self.user_input.bind("<Return>", lambda event: self.send_message())
+        self.user_input.focus_set()
+        
+        # Send button
+        send_button = ttk.Button(
+            input_frame,
+            text="Send",
+            command=self.send_message,
+            style='FridaySend.TButton'
+        )
+        send_button.pack(side=tk.RIGHT, padx=5)
+
+    def create_status_bar(self, parent):
+        """Create status bar at bottom"""
+        status_frame = tk.Frame(parent, bg=self.input_bg, height=25)
+        status_frame.pack(fill=tk.X, side=tk.BOTTOM)
+        
+        # Status label
+        self.status_label = tk.Label(
+            status_frame,
+            text="Ready",
+            bg=self.input_bg,
+            fg=self.text_color,
+            anchor=tk.W,
+            padx=10
+        )
+        self.status_label.pack(side=tk.LEFT, fill=tk.X)
+        
+        # Model info; kept on the instance and updated only when FridayCore
+        # reports an actual model change rather than being rebuilt
+        self._model_label = tk.Label(
+            status_frame,
+            text=f"Model: {self.friday.model_name}",
+            bg=self.input_bg,
+            fg=self.text_color,
+            anchor=tk.E,
+            padx=10
+        )
+        self._model_label.pack(side=tk.RIGHT)
+        self.friday.model_changed_callback = self._on_model_changed
+
+    def _on_model_changed(self, model_name):
+        """Refresh the status-bar model label after a model swap"""
+        self._model_label.config(text=f"Model: {model_name}")
+
+    def send_message(self):
+        """Process and send the message typed into the Entry field"""
+        self._submit_message(self.user_input.get().strip(), from_entry=True)
+
+    def _submit_message(self, text, from_entry=False):
+        """Display and enqueue a message for processing
+
+        Voice-driven submissions pass from_entry=False and skip the Entry
+        manipulation entirely, avoiding needless Tk work when the text
+        never came from the widget.
+        """
+        if not text:
+            return
+
+        # Clear input field
+        if from_entry:
+            self.user_input.delete(0, tk.END)
+
+        # Display user message
+        self.display_user_message(text)
+
+        # Update status
+        self.update_status("Processing...")
+
+        # Hand off to the persistent worker thread to keep the UI responsive
+        self._msg_queue.put(text)
+
+    def _message_worker(self):
+        """Process queued messages one at a time off the UI thread"""
+        while True:
+            msg = self._msg_queue.get()
+            if msg is None:  # Poison pill from on_closing
+                self._msg_queue.task_done()
+                break
+            self.process_message_thread(msg)
+            self._msg_queue.task_done()
+
+    def _schedule_ui(self, fn):
+        """Queue a UI callback, coalescing bursts into one after() event
+
+        Worker threads can emit several UI updates in quick succession
+        (streaming responses, voice partials); queueing them and flushing
+        once keeps the Tk event queue from flooding.
+        """
+        self._ui_queue.append(fn)
+        if self._pending_ui is None:
+            self._pending_ui = self.root.after(0, self._flush_ui_queue)
+
+    def _flush_ui_queue(self):
+        """Run all queued UI callbacks in one event-loop pass"""
+        self._pending_ui = None
+        while self._ui_queue:
+            self._ui_queue.popleft()()
+
+    def _tts_worker(self):
+        """Synthesize queued sentences in order on a background thread"""
+        while True:
+            text = self._tts_queue.get()
+            if text is not None and not self._tts_cancel.is_set():
+                self.friday.speak(text)
+            self._tts_queue.task_done()
+
+    def _drain_tts_queue(self):
+        """Discard pending speech and skip any in-flight synthesis"""
+        self._tts_cancel.set()
+        try:
+            while True:
+                self._tts_queue.get_nowait()
+                self._tts_queue.task_done()
+        except queue.Empty:
+            pass
+        self._tts_cancel.clear()
+        # speak() only enqueues, so sentences already forwarded to the
+        # core keep playing unless its queue is flushed too
+        self.friday.cancel_speech()
+
+    def _is_sentence_boundary(self, text):
+        """Check whether buffered stream text ends on a sentence boundary"""
+        if len(text.strip()) < 10:
+            return False
+        if not _SENT_END_RE.search(text):
+            return False
+        # Don't split on common abbreviations
+        if _ABBREV_RE.search(text):
+            return False
+        return True
+
+    def _emit_stream_sentence(self, sentence, started):
+        """Display (and optionally speak) one completed sentence"""
+        if not started:
+            self._schedule_ui(self._begin_assistant_stream)
+
+        self._schedule_ui(partial(self._append_stream_text, sentence))
+
+        # Queue each sentence for synthesis as soon as it completes so
+        # audio starts while the LLM is still generating
+        if self.voice_active and not self.friday.privacy_mode:
+            self._tts_queue.put(sentence)
+
+        return True
+
+    def process_message_thread(self, user_message):
+        """Process message in background thread
+
+        Consumes the token stream from FridayCore, buffering to sentence
+        boundaries so the first sentence appears (and is spoken) while the
+        rest of the response is still generating.
+        """
+        try:
+            buffer = ""
+            started = False
+            for token in self.friday.process_text_input_stream(user_message):
+                buffer += token
+                if self._is_sentence_boundary(buffer):
+                    started = self._emit_stream_sentence(buffer, started)
+                    buffer = ""
+
+            # Flush any trailing partial sentence
+            if buffer.strip():
+                started = self._emit_stream_sentence(buffer, started)
+
+            if started:
+                self._schedule_ui(self._end_assistant_stream)
+            self._schedule_ui(partial(self.update_status, "Ready"))
+
+        except Exception as e:
+            error_msg = f"Error processing message: {str(e)}"
+            self._schedule_ui(partial(self.display_system_message, error_msg))
+            self._schedule_ui(partial(self.update_status, "Error occurred"))
+
+    def _request_see_end(self):
+        """Request an autoscroll to the bottom, throttled to ~20 Hz
+
+        Rapid streaming inserts would otherwise force a re-layout and
+        scroll per update, and would yank the viewport away from a user
+        who has scrolled back to read earlier history.
+        """
+        if not self._see_pending:
+            self._see_pending = True
+            self.root.after(50, self._do_see_end)
+
+    def _do_see_end(self):
+        """Scroll to the bottom if the user is already near it"""
+        self._see_pending = False
+        if self.chat_display.yview()[1] > 0.95:
+            self.chat_display.see(tk.END)
+
+    def _timestamp_prefix(self):
+        """Return the "[HH:MM:SS] " prefix, cached for the current second
+
+        time.strftime skips the datetime object construction that
+        datetime.now().strftime pays, and near-simultaneous inserts
+        (streaming, voice) reuse the same string.
+        """
+        now = int(time.time())
+        if now != self._ts_cache_second:
+            self._ts_cache_second = now
+            self._ts_cache_prefix = f"[{time.strftime('%H:%M:%S')}] "
+        return self._ts_cache_prefix
+
+    def _trim_chat_display(self):
+        """Drop the oldest lines once the widget exceeds MAX_CHAT_LINES
+
+        The Text widget gets slower to insert into and redraw as it grows,
+        so it is treated as a bounded viewport cache. Must be called while
+        the widget state is NORMAL.
+        """
+        total_lines = int(self.chat_display.index('end-1c').split('.')[0])
+        excess = total_lines - MAX_CHAT_LINES
+        if excess > 0:
+            self.chat_display.delete('1.0', f'{excess + 1}.0')
+
+    def display_user_message(self, message):
+        """Display user message in chat"""
+        if self._defer_message("user", message):
+            return
+
+        self.chat_display.config(state=tk.NORMAL)
+
+        # Timestamp, label and body in a single Tcl round-trip
+        self.chat_display.insert(
+            tk.END,
+            self._timestamp_prefix(), "timestamp",
+            "You: ", "user_label",
+            f"{message}\n\n", "user_message",
+        )
+
+        self._trim_chat_display()
+        self.chat_display.config(state=tk.DISABLED)
+        self._request_see_end()
+
+    def display_assistant_message(self, message):
+        """Display assistant message in chat"""
+        if self._defer_message("assistant", message):
+            return
+
+        self.chat_display.config(state=tk.NORMAL)
+
+        # Timestamp, label and body in a single Tcl round-trip
+        self.chat_display.insert(
+            tk.END,
+            self._timestamp_prefix(), "timestamp",
+            "FRIDAY: ", "assistant_label",
+            f"{message}\n\n", "assistant_message",
+        )
+
+        self._trim_chat_display()
+        self.chat_display.config(state=tk.DISABLED)
+        self._request_see_end()
+
+    def _begin_assistant_stream(self):
+        """Write the timestamp and FRIDAY label for a streamed response"""
+        self.chat_display.config(state=tk.NORMAL)
+        self.chat_display.insert(
+            tk.END,
+            self._timestamp_prefix(), "timestamp",
+            "FRIDAY: ", "assistant_label",
+        )
+        self.chat_display.config(state=tk.DISABLED)
+        self._request_see_end()
+
+    def _append_stream_text(self, text):
+        """Append a chunk of streamed assistant text to the chat"""
+        self.chat_display.config(state=tk.NORMAL)
+        self.chat_display.insert(tk.END, text, "assistant_message")
+        self.chat_display.config(state=tk.DISABLED)
+        self._request_see_end()
+
+    def _end_assistant_stream(self):
+        """Close out a streamed assistant message"""
+        self.chat_display.config(state=tk.NORMAL)
+        self.chat_display.insert(tk.END, "\n\n", "assistant_message")
+        self._trim_chat_display()
+        self.chat_display.config(state=tk.DISABLED)
+        self._request_see_end()
+
+    def display_system_message(self, message):
+        """Display system message in chat"""
+        if self._defer_message("system", message):
+            return
+
+        self.chat_display.config(state=tk.NORMAL)
+
+        # Label and body in a single Tcl round-trip
+        self.chat_display.insert(
+            tk.END,
+            "System: ", "system_label",
+            f"{message}\n\n", "system_message",
+        )
+
+        self._trim_chat_display()
+        self.chat_display.config(state=tk.DISABLED)
+        self._request_see_end()
+
+    def update_status(self, message):
+        """Update status bar message"""
+        self.status_label.config(text=message)
+
+    def toggle_voice(self):
+        """Toggle voice recognition on/off"""
+        if self.voice_active:
+            # Turn off voice
+            self.voice_active = False
+            self.voice_button.config(text="🎤 Voice: OFF")
+            self.update_status("Voice recognition deactivated")
+            # Drop any queued speech (barge-in)
+            self._drain_tts_queue()
+            # Signal the voice thread to stop; the listen loop polls the
+            # event, so join shortly afterwards without freezing the UI
+            self.friday.stop_event.set()
+            self.root.after(50, self._join_voice_thread)
+        else:
+            # Turn on voice
+            self.voice_active = True
+            self.voice_button.config(text="🎤 Voice: ON")
+            self.update_status("Voice recognition activated")
+            self.display_system_message("Voice recognition activated. Say 'Hey FRIDAY' to get my attention.")
+            
+            # Start voice thread
+            self.friday.stop_event.clear()
+            self.voice_thread = threading.Thread(target=self.voice_listen_thread, daemon=True)
+            self.voice_thread.start()
+
+    def _join_voice_thread(self):
+        """Reap a stopping voice thread with a short, non-blocking join"""
+        if self.voice_thread and self.voice_thread.is_alive():
+            self.voice_thread.join(timeout=0.1)
+
+    def voice_listen_thread(self):
+        """Background thread for voice recognition"""
+        # Reset stop flag
+        self.friday.stop_event.clear()
+        
+        # Start listening
+        try:
+            self.friday.listen()
+        except Exception as e:
+            self.root.after(0, lambda: self.display_system_message(f"Voice error: {str(e)}"))
+            self.root.after(0, lambda: self.toggle_voice())  # Turn off voice on error
+            
+        # Update button if thread exits
+        if self.voice_active:
+            self.root.after(0, lambda: self.toggle_voice())
+
+    def toggle_privacy(self):
+        """Toggle privacy mode"""
+        self.friday.toggle_privacy()
+        privacy_status = "ON" if self.friday.privacy_mode else "OFF"
+        privacy_icon = "🔐" if self.friday.privacy_mode else "🔒"
+        
+        self.privacy_button.config(text=f"{privacy_icon} Privacy: {privacy_status}")
+        self.display_system_message(f"Privacy mode: {privacy_status}")
+
+    def save_chat(self):
+        """Save chat history to file"""
+        try:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".json",
+                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                title="Save Chat History"
+            )
+            
+            if not file_path:
+                return
+                
+            success = self.friday.save_conversation(file_path)
+            
+            if success:
+                self.display_system_message(f"Chat history saved to {file_path}")
+            else:
+                self.display_system_message("Failed to save chat history")
+                
+        except Exception as e:
+            self.display_system_message(f"Error saving chat: {str(e)}")
+
+    def load_chat(self):
+        """Load chat history from file"""
+        try:
+            file_path = filedialog.askopenfilename(
+                filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+                title="Load Chat History"
+            )
+            
+            if not file_path:
+                return
+                
+            success = self.friday.load_conversation(file_path)
+            
+            if success:
+                # Render only the newest page as one bulk insert; older
+                # messages are paged in on demand by _on_chat_scroll
+                history = list(self.friday.conversation_history)
+                self._visible_start_idx = max(0, len(history) - INITIAL_RENDER_MESSAGES)
+                args = self._history_insert_args(history[self._visible_start_idx:])
+
+                self.chat_display.config(state=tk.NORMAL)
+                self.chat_display.delete(1.0, tk.END)
+                if args:
+                    self.chat_display.insert(tk.END, *args)
+                self._trim_chat_display()
+                self.chat_display.config(state=tk.DISABLED)
+                self.chat_display.see(tk.END)
+
+                self.display_system_message(f"Chat history loaded from {file_path}")
+            else:
+                self.display_system_message("Failed to load chat history")
+                
+        except Exception as e:
+            self.display_system_message(f"Error loading chat: {str(e)}")
+
+    def on_closing(self):
+        """Handle window closing"""
+        # Stop voice thread if running
+        if self.voice_active:
+            self.friday.stop_event.set()
+            if self.voice_thread and self.voice_thread.is_alive():
+                self.voice_thread.join(timeout=0.1)
+        
+        # Ask user to confirm exit
+        if messagebox.askokcancel("Quit", "Do you want to quit FRIDAY?"):
+            # Shut down the message worker
+            self._msg_queue.put(None)
+            self.root.destroy()
+            sys.exit(0)
+
+
+# Main function to start the app
+def main():
+    # Create tkinter root
+    root = tk.Tk()
+    
+    # Set window icon (if available)
+    try:
+        # Set taskbar icon (Windows)
+        import ctypes
+        myappid = 'ai.friday.assistant.1.0'  # arbitrary string
+        ctypes.windll.shell32.SetCurrentProcessExplicitAppUserModelID(myappid)
+    except:
+        pass
+    
+    # Create and run app
+    app = FridayApp(root)
+    root.mainloop()
+
+
+if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,389 +1,1008 @@
-"""
-FRIDAY - Offline AI Assistant
-Core module containing all assistant functionality in a single script
-"""
-
-import os
-import re
-import json
-import time
-import random
-import threading
-import queue
-import requests
-import pyttsx3
-import speech_recognition as sr
-from datetime import datetime
-from collections import deque
-
-
-class FridayCore:
-    """
-    Core class for the FRIDAY AI Assistant
-    Contains all essential functionality in a single class
-    """
-
-    def __init__(self, wake_word="friday", max_context_length=10):
-        """Initialize FRIDAY with essential components"""
-        print("Initializing FRIDAY Assistant...")
-        
-        # Core components
-        self.name = "FRIDAY"
-        self.wake_word = wake_word.lower()
-        self.is_listening = False
-        self.should_stop = False
-        self.privacy_mode = False
-        
-        # Context management
-        self.max_context_length = max_context_length
-        self.conversation_history = deque(maxlen=max_context_length)
-        self.current_emotion = "neutral"
-        
-        # Initialize voice components
-        self.initialize_voice()
-        
-        # Initialize LLM connection
-        self.initialize_llm()
-        
-        # Command handling
-        self.initialize_commands()
-        
-        # Queue for communication between threads
-        self.audio_queue = queue.Queue()
-        
-        print(f"{self.name} initialized and ready.")
-        self.speak("I am here and ready to assist you.")
-
-    def initialize_voice(self):
-        """Set up speech recognition and synthesis"""
-        # Text-to-Speech
-        self.engine = pyttsx3.init()
-        self.engine.setProperty('rate',150)  # Speed of speech
-        
-        # Get available voices and set to female voice if available
-        voices = self.engine.getProperty('voices')
-        for voice in voices:
-                self.engine.setProperty('voice', voice.id)
-                break
-        
-        # Speech recognition
-        self.recognizer = sr.Recognizer()
-        self.recognizer.energy_threshold = 2000
-        self.recognizer.dynamic_energy_threshold = True
-        self.recognizer.pause_threshold = 0.8
-        
-        try:
-            # Test microphone availability
-            with sr.Microphone() as source:
-                self.recognizer.adjust_for_ambient_noise(source, duration=1)
-                print("Microphone initialized successfully")
-        except Exception as e:
-            print(f"Warning: Microphone initialization failed: {e}")
-            print("Voice input will not be available")
-
-    def initialize_llm(self):
-        """Set up connection to local LLM via Ollama"""
-        self.model_name = "deepseek-r1:1.5b"
-        self.ollama_url = "http://localhost:11434/api/generate"
-        
-        # Test connection to Ollama
-        try:
-            response = requests.get("http://localhost:11434/api/tags")
-            models = response.json().get("models", [])
-            model_exists = any(model["name"] == self.model_name for model in models)
-            
-            if not model_exists:
-                print(f"Warning: {self.model_name} not found. Please run: ollama pull {self.model_name}")
-            else:
-                print(f"Successfully connected to Ollama with {self.model_name}")
-                
-        except requests.exceptions.ConnectionError:
-            print("Warning: Cannot connect to Ollama server. Is it running?")
-            print("Start Ollama with: ollama serve")
-
-    def initialize_commands(self):
-        """Set up command handling"""
-        self.commands = {
-            "tell me a story": self.tell_story,
-            "what time is it": self.tell_time,
-            "what's the time": self.tell_time,
-            "current time": self.tell_time,
-            "privacy shield": self.toggle_privacy,
-            "privacy mode": self.toggle_privacy,
-            "stop listening": self.stop_listening,
-            "goodbye": self.stop_listening,
-            "exit": self.stop_listening,
-            "help": self.show_help,
-        }
-
-    def speak(self, text):
-        """Convert text to speech"""
-        if self.privacy_mode:
-            print(f"[PRIVACY MODE] {self.name} would say: {text}")
-            return
-            
-        print(f"{self.name}: {text}")
-        self.engine.say(text)
-        self.engine.runAndWait()
-
-    def listen(self):
-        """Listen for wake word and commands"""
-        self.is_listening = True
-        self.should_stop = False
-        
-        print(f"Listening for wake word: 'Hey {self.name}'")
-        
-        # Start background listening thread
-        threading.Thread(target=self._listen_thread, daemon=True).start()
-        
-        # Process audio queue in main thread
-        while not self.should_stop:
-            try:
-                audio_data = self.audio_queue.get(timeout=0.5)
-                self._process_audio(audio_data)
-            except queue.Empty:
-                pass
-            except KeyboardInterrupt:
-                self.should_stop = True
-                break
-        
-        self.is_listening = False
-        print(f"{self.name} has stopped listening.")
-
-    def _listen_thread(self):
-        """Background thread to capture audio"""
-        with sr.Microphone() as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=1)
-            
-            while not self.should_stop:
-                try:
-                    audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=10)
-                    self.audio_queue.put(audio)
-                except sr.WaitTimeoutError:
-                    pass
-                except Exception as e:
-                    print(f"Error in listen thread: {e}")
-                    time.sleep(1)
-
-    def _process_audio(self, audio):
-        """Process captured audio"""
-        try:
-            # First try with Google (online, more accurate when available)
-            text = self.recognizer.recognize_google(audio)
-        except sr.RequestError:
-            try:
-                # Fallback to Sphinx (offline, less accurate)
-                text = self.recognizer.recognize_sphinx(audio)
-            except:
-                return
-        except:
-            return
-            
-        text = text.lower()
-        print(f"Recognized: {text}")
-        
-        # Check for wake word
-        wake_patterns = [
-            f"hey {self.wake_word}",
-            f"ok {self.wake_word}",
-            f"okay {self.wake_word}",
-            f"hi {self.wake_word}",
-            self.wake_word
-        ]
-        
-        if any(pattern in text for pattern in wake_patterns):
-            # Remove wake phrase from text
-            for pattern in wake_patterns:
-                if pattern in text:
-                    command = text.replace(pattern, "").strip()
-                    break
-            else:
-                command = ""
-                
-            self._process_command(command)
-
-    def _process_command(self, command):
-        """Process voice command"""
-        if not command:
-            self.speak("How can I help you?")
-            return
-            
-        # Check for direct command matches
-        for cmd, func in self.commands.items():
-            if cmd in command:
-                func()
-                return
-                
-        # If no direct match, send to LLM
-        self._handle_conversation(command)
-
-    def _handle_conversation(self, user_input):
-        """Process conversation with LLM"""
-        # Add user message to history
-        self.conversation_history.append({"role": "user", "content": user_input})
-        
-        # Get response from LLM
-        response = self.query_llm(user_input)
-        
-        # Add assistant response to history
-        self.conversation_history.append({"role": "assistant", "content": response})
-        
-        # Speak the response
-        self.speak(response)
-
-    def query_llm(self, prompt):
-        """Send prompt to Ollama LLM and get response"""
-        try:
-            # Build context from conversation history
-            context = ""
-            for message in self.conversation_history:
-                role_prefix = "User: " if message["role"] == "user" else f"{self.name}: "
-                context += f"{role_prefix}{message['content']}\n"
-            
-            # Add current query if not in history yet
-            if not any(message["content"] == prompt and message["role"] == "user" 
-                      for message in self.conversation_history):
-                context += f"User: {prompt}\n{self.name}: "
-            
-            # Prepare request for Ollama
-            data = {
-                "model": self.model_name,
-                "prompt": context,
-                "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "top_p": 0.9,
-                    "top_k": 40,
-                    "num_predict": 256,  # Limit response length to save resources
-                }
-            }
-            
-            # Send request
-            response = requests.post(self.ollama_url, json=data, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                return result.get("response", "I'm sorry, I couldn't process that request.")
-            else:
-                print(f"LLM request failed with status code: {response.status_code}")
-                return "I'm having trouble connecting to my brain right now."
-        
-        except requests.exceptions.RequestException as e:
-            print(f"Error communicating with Ollama: {e}")
-            return "I'm having trouble connecting to my language model. Is Ollama running?"
-        except Exception as e:
-            print(f"Unexpected error in LLM query: {e}")
-            return "I encountered an unexpected error. Please try again."
-
-    def analyze_sentiment(self, text):
-        """Simple rule-based sentiment analysis to detect emotion"""
-        # This is a very basic implementation
-        # In a production system, you might use a proper NLP model
-        
-        text = text.lower()
-        
-        # Simple keyword matching
-        if any(word in text for word in ["happy", "great", "excellent", "glad", "joy"]):
-            return "happy"
-        elif any(word in text for word in ["sad", "sorry", "unhappy", "unfortunate"]):
-            return "sad"
-        elif any(word in text for word in ["angry", "mad", "furious", "upset"]):
-            return "angry"
-        elif any(word in text for word in ["confused", "unclear", "don't understand"]):
-            return "confused"
-        else:
-            return "neutral"
-
-    # Command Functions
-    def tell_time(self):
-        """Tell the current time"""
-        current_time = datetime.now().strftime("%I:%M %p")
-        self.speak(f"The current time is {current_time}")
-
-    def tell_story(self):
-        """Generate a short story using the LLM"""
-        self.speak("Let me think of a story for you...")
-        story_prompt = "Generate a short, engaging story (less than 100 words)"
-        story = self.query_llm(story_prompt)
-        self.speak(story)
-
-    def toggle_privacy(self):
-        """Toggle privacy mode on/off"""
-        self.privacy_mode = not self.privacy_mode
-        if self.privacy_mode:
-            self.speak("Privacy shield activated. I'll be more discreet.")
-        else:
-            self.speak("Privacy shield deactivated. Normal operations resumed.")
-
-    def stop_listening(self):
-        """Stop the assistant from listening"""
-        self.speak("Goodbye. Going offline now.")
-        self.should_stop = True
-
-    def show_help(self):
-        """Show available commands"""
-        help_text = "Here are some commands you can use: "
-        for i, cmd in enumerate(self.commands.keys()):
-            if i > 0:
-                help_text += ", "
-            help_text += cmd
-        self.speak(help_text)
-    
-    def process_text_input(self, text):
-        """Process text input from GUI"""
-        if not text:
-            return "Please enter a message."
-            
-        # Add to conversation history
-        self.conversation_history.append({"role": "user", "content": text})
-        
-        # Check for direct commands
-        for cmd, func in self.commands.items():
-            if cmd in text.lower():
-                func()
-                return f"Command '{cmd}' executed."
-        
-        # Get response from LLM
-        response = self.query_llm(text)
-        
-        # Add to conversation history
-        self.conversation_history.append({"role": "assistant", "content": response})
-        
-        return response
-
-    def save_conversation(self, filepath):
-        """Save conversation history to a file"""
-        try:
-            with open(filepath, 'w') as f:
-                json.dump(list(self.conversation_history), f, indent=2)
-            return True
-        except Exception as e:
-            print(f"Error saving conversation: {e}")
-            return False
-
-    def load_conversation(self, filepath):
-        """Load conversation history from a file"""
-        try:
-            if os.path.exists(filepath):
-                with open(filepath, 'r') as f:
-                    loaded_history = json.load(f)
-                    # Clear current history and add loaded messages
-                    self.conversation_history.clear()
-                    for message in loaded_history:
-                        self.conversation_history.append(message)
-                return True
-            return False
-        except Exception as e:
-            print(f"Error loading conversation: {e}")
-            return False
-
-
-# If run directly, start FRIDAY in voice mode
-if __name__ == "__main__":
-    try:
-        friday = FridayCore()
-        friday.listen()
-    except KeyboardInterrupt:
-        print("\nShutting down FRIDAY...")
-    except Exception as e:
+"""
+FRIDAY - Offline AI Assistant
+Core module containing all assistant functionality in a single script
+"""
+
+import os
+import re
+import json
+import mmap
+import heapq
+import struct
+import time
+import random
+import threading
+import queue
+import requests
+import difflib
+import pyttsx3
+import speech_recognition as sr
+
+# Embedding math for the semantic cache; optional so the assistant
+# still starts without it (the cache just stays disabled)
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Local STT backend; optional so the assistant still starts without it
+try:
+    import vosk
+except ImportError:
+    vosk = None
+from datetime import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson (a Rust implementation) encodes and decodes the several-KB
+# Ollama payloads a few times faster than the stdlib; fall back to json
+# when it is not installed
+try:
+    import orjson
+
+    def _json_dumps(obj):
+        return orjson.dumps(obj)
+
+    _json_loads = orjson.loads
+except ImportError:
+    orjson = None
+
+    def _json_dumps(obj):
+        return json.dumps(obj).encode("utf-8")
+
+    _json_loads = json.loads
+
+# Sentence terminator for chunking streamed responses into speakable units
+_SENTENCE_END_RE = re.compile(r'[.!?]\s')
+
+# Chosen TTS voice id, cached across instances because enumerating
+# voices on SAPI5/espeak is slow
+_VOICE_ID = None
+
+
+class FridayCore:
+    """
+    Core class for the FRIDAY AI Assistant
+    Contains all essential functionality in a single class
+    """
+
+    def __init__(self, wake_word="friday", max_context_length=10):
+        """Initialize FRIDAY with essential components"""
+        print("Initializing FRIDAY Assistant...")
+        
+        # Core components
+        self.name = "FRIDAY"
+        # Role prefixes bound once instead of re-formatted per message
+        self._user_prefix = "User: "
+        self._assist_prefix = f"{self.name}: "
+        self.wake_word = wake_word.lower()
+        self.is_listening = False
+        self.stop_event = threading.Event()
+        self.privacy_mode = False
+        
+        # Context management
+        self.max_context_length = max_context_length
+        self.conversation_history = deque(maxlen=max_context_length)
+        self.current_emotion = "neutral"
+
+        # Pre-formatted history lines kept in lockstep with the deque so
+        # building the LLM context is a single join instead of re-formatting
+        # every message each turn
+        self._context_lines = []
+
+        # Bound the context by characters too (~4 chars/token, with
+        # headroom under the model's num_ctx) so a few long turns cannot
+        # overflow the window and force full-prompt recompute
+        self._ctx_char_budget = 4 * 1800
+        self._ctx_chars = 0
+
+        # Serialized history blob reused by save_conversation until the
+        # next append invalidates it, so frequent saves (e.g. autosave)
+        # do not re-serialize an unchanged history
+        self._history_json_cache = None
+        self._history_json_dirty = True
+
+        # Optional append-only conversation log; each turn is appended as
+        # it happens so "saving" never rewrites the full history
+        self.log_path = None
+        
+        # Initialize voice components
+        self.initialize_voice()
+        
+        # Initialize LLM connection
+        self.initialize_llm()
+
+        # Semantic response cache
+        self.initialize_semantic_cache()
+
+        # Command handling
+        self.initialize_commands()
+        
+        # Queue for communication between threads
+        self.audio_queue = queue.Queue()
+        
+        print(f"{self.name} initialized and ready.")
+        self.speak("I am here and ready to assist you.")
+
+    def initialize_voice(self):
+        """Set up speech recognition and synthesis"""
+        # Text-to-Speech
+        self.engine = pyttsx3.init()
+        self.engine.setProperty('rate',150)  # Speed of speech
+        
+        # Pick a female voice if available, enumerating voices only once
+        # per process
+        global _VOICE_ID
+        if _VOICE_ID is None:
+            voices = self.engine.getProperty('voices')
+            if voices:
+                _VOICE_ID = next(
+                    (v.id for v in voices
+                     if 'female' in v.name.lower() or 'zira' in v.id.lower()),
+                    voices[0].id
+                )
+        if _VOICE_ID is not None:
+            self.engine.setProperty('voice', _VOICE_ID)
+        
+        # Dedicated TTS worker so speak() never blocks the caller on
+        # playback; recognition and LLM work overlap with audio output
+        self._tts_q = queue.Queue()
+        threading.Thread(target=self._tts_worker, daemon=True).start()
+
+        # Prefer a local Vosk model for recognition: no network round-trip
+        # per utterance and it works fully offline as advertised. Set
+        # use_online_stt to route through Google instead when online.
+        self.use_online_stt = False
+        self._vosk = None
+        if vosk is not None:
+            try:
+                self._vosk = vosk.Model("model-en-us-0.22-small")
+                print("Loaded local Vosk speech model")
+            except Exception as e:
+                print(f"Warning: Could not load Vosk model: {e}")
+
+        # Speech recognition
+        self.recognizer = sr.Recognizer()
+        self.recognizer.energy_threshold = 2000
+        self.recognizer.dynamic_energy_threshold = True
+        self.recognizer.pause_threshold = 0.8
+        
+        try:
+            # Test microphone availability
+            with sr.Microphone() as source:
+                self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                print("Microphone initialized successfully")
+        except Exception as e:
+            print(f"Warning: Microphone initialization failed: {e}")
+            print("Voice input will not be available")
+
+    def initialize_llm(self):
+        """Set up connection to local LLM via Ollama"""
+        self.model_name = "deepseek-r1:1.5b"
+        self.ollama_url = "http://localhost:11434/api/generate"
+
+        # Persistent session so every Ollama call reuses the same
+        # keep-alive connection instead of paying a TCP handshake per turn
+        self._http = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        self._http.mount("http://", adapter)
+        self._http.headers.update({"Connection": "keep-alive"})
+
+        # Fixed preamble: keeping the prompt prefix byte-identical across
+        # turns lets llama.cpp reuse its KV cache, so prefill only covers
+        # the new tokens of the current turn
+        self.system_prefix = (
+            f"You are {self.name}, a helpful offline voice assistant. "
+            "Answer concisely and conversationally.\n"
+        )
+
+        # Observer invoked with the new model name when the model changes
+        self.model_changed_callback = None
+
+        # Speculative prefetch: a transcription that finishes early can
+        # start generating while earlier utterances are still in flight
+        self._spec_pool = ThreadPoolExecutor(max_workers=1)
+        self._spec_lock = threading.Lock()
+        self._spec_prompt = None
+        self._spec_future = None
+
+        # Probe Ollama in the background so a slow or absent server never
+        # delays startup; _llm_ready is set once the probe completes
+        self._llm_ready = threading.Event()
+        threading.Thread(target=self._probe_ollama, daemon=True).start()
+
+    def _probe_ollama(self):
+        """Check Ollama availability and model presence off the main thread"""
+        try:
+            response = self._http.get("http://localhost:11434/api/tags")
+            model_names = {model["name"] for model in response.json().get("models", [])}
+
+            if self.model_name not in model_names:
+                print(f"Warning: {self.model_name} not found. Please run: ollama pull {self.model_name}")
+            else:
+                print(f"Successfully connected to Ollama with {self.model_name}")
+
+        except requests.exceptions.ConnectionError:
+            print("Warning: Cannot connect to Ollama server. Is it running?")
+            print("Start Ollama with: ollama serve")
+        finally:
+            self._llm_ready.set()
+
+    def initialize_semantic_cache(self):
+        """Set up the semantic prompt cache
+
+        Paraphrased repeats of a prompt hit the cache via an embedding
+        cosine-similarity lookup and skip the multi-second LLM round-trip
+        entirely.
+        """
+        self.embedding_model = "nomic-embed-text"
+        self.embeddings_url = "http://localhost:11434/api/embeddings"
+        self.sem_cache_path = "friday_sem_cache.json"
+        self.sem_emb_path = "friday_sem_cache.emb"
+        self.sem_cache_threshold = 0.85
+        self.sem_cache_max_entries = 512
+        self.sem_cache_ttl = 24 * 3600  # Expire entries after a day
+
+        # Embeddings are kept in float16: half the memory traffic per
+        # cosine scan, and the precision loss is far below the 0.85
+        # similarity threshold
+        self._sem_cache = []   # [{"prompt", "response", "ts"}, ...]
+        self._sem_embs = None  # (N, D) float16 matrix, rows L2-normalized
+        self._load_semantic_cache()
+
+    def _load_semantic_cache(self):
+        """Load persisted cache metadata and map in the embedding matrix"""
+        if np is None:
+            return
+        try:
+            if not os.path.exists(self.sem_cache_path):
+                return
+            with open(self.sem_cache_path, 'r') as f:
+                entries = json.load(f)
+            if not entries or not os.path.exists(self.sem_emb_path):
+                return
+            dim = os.path.getsize(self.sem_emb_path) // (2 * len(entries))
+            if dim == 0:
+                return
+            self._sem_cache = [
+                {"prompt": e["prompt"], "response": e["response"], "ts": e["ts"]}
+                for e in entries
+            ]
+            # Read-only memmap: warm start pages rows in on demand rather
+            # than parsing embeddings out of JSON
+            self._sem_embs = np.memmap(self.sem_emb_path, dtype=np.float16,
+                                       mode='r', shape=(len(entries), dim))
+        except Exception as e:
+            print(f"Warning: Could not load semantic cache: {e}")
+            self._sem_cache = []
+            self._sem_embs = None
+
+    def _save_semantic_cache(self):
+        """Persist cache metadata and the float16 embedding matrix"""
+        if np is None:
+            return
+        try:
+            with open(self.sem_cache_path, 'w') as f:
+                json.dump(self._sem_cache, f)
+            np.asarray(self._sem_embs, dtype=np.float16).tofile(self.sem_emb_path)
+        except Exception as e:
+            print(f"Warning: Could not save semantic cache: {e}")
+
+    def _embed(self, text):
+        """Get an L2-normalized embedding from Ollama, or None on failure"""
+        if np is None:
+            return None
+        try:
+            response = self._http.post(
+                self.embeddings_url,
+                json={"model": self.embedding_model, "prompt": text},
+                timeout=10
+            )
+            if response.status_code != 200:
+                return None
+            emb = np.asarray(response.json().get("embedding", []), dtype=np.float32)
+            if emb.size == 0:
+                return None
+            norm = np.linalg.norm(emb)
+            if norm == 0:
+                return None
+            return emb / norm
+        except Exception:
+            return None
+
+    def _semantic_cache_lookup(self, q_emb):
+        """Return the cached response for a similar prompt, or None"""
+        if self._sem_embs is None or not self._sem_cache:
+            return None
+        if self._sem_embs.shape[1] != q_emb.size:
+            # The matrix width is inferred from the sidecar's file size,
+            # so if the metadata JSON and the .emb file ever disagree
+            # (e.g. a crash between the two writes in
+            # _save_semantic_cache) every matmul would raise. Discard the
+            # cache and degrade to a miss; the next store rewrites both
+            # files consistently.
+            print("Warning: semantic cache embedding size mismatch; discarding cache")
+            self._sem_cache = []
+            self._sem_embs = None
+            return None
+
+        # Rows and query are normalized, so the dot product is the cosine
+        scores = (self._sem_embs @ q_emb.astype(np.float16)).astype(np.float32)
+        best = int(np.argmax(scores))
+        entry = self._sem_cache[best]
+        if (scores[best] > self.sem_cache_threshold
+                and time.time() - entry["ts"] < self.sem_cache_ttl):
+            return entry["response"]
+        return None
+
+    def _semantic_cache_store(self, q_emb, prompt, response):
+        """Add a prompt/response pair to the cache, evicting the oldest"""
+        self._sem_cache.append({"prompt": prompt, "response": response,
+                                "ts": time.time()})
+        q16 = q_emb.astype(np.float16)
+        if self._sem_embs is None:
+            self._sem_embs = q16[np.newaxis, :]
+        else:
+            # Materializes the read-only memmap on first insert
+            self._sem_embs = np.vstack([np.asarray(self._sem_embs), q16])
+
+        if len(self._sem_cache) > self.sem_cache_max_entries:
+            drop = len(self._sem_cache) - self.sem_cache_max_entries
+            self._sem_cache = self._sem_cache[drop:]
+            self._sem_embs = self._sem_embs[drop:]
+
+        self._save_semantic_cache()
+
+    def set_model(self, model_name):
+        """Switch to a different Ollama model and notify any observer"""
+        if model_name != self.model_name:
+            self.model_name = model_name
+            if self.model_changed_callback:
+                self.model_changed_callback(model_name)
+
+    def initialize_commands(self):
+        """Set up command handling"""
+        self.commands = {
+            "tell me a story": self.tell_story,
+            "what time is it": self.tell_time,
+            "what's the time": self.tell_time,
+            "current time": self.tell_time,
+            "privacy shield": self.toggle_privacy,
+            "privacy mode": self.toggle_privacy,
+            "stop listening": self.stop_listening,
+            "goodbye": self.stop_listening,
+            "exit": self.stop_listening,
+            "help": self.show_help,
+        }
+
+        # All command phrases compiled into one alternation, longest
+        # first, so dispatch is a single scan and overlapping phrases
+        # resolve deterministically instead of by dict-insertion order
+        self._cmd_re = re.compile(
+            "|".join(re.escape(cmd) for cmd in
+                     sorted(self.commands, key=len, reverse=True))
+        )
+
+        # Wake-word matcher compiled once; a single C-level regex pass
+        # replaces rebuilding the pattern list and scanning it twice for
+        # every recognized utterance
+        self._wake_re = re.compile(
+            r'(?:\b(?:hey|ok|okay|hi)\s+)?' + re.escape(self.wake_word) + r'\b\s*',
+            re.IGNORECASE
+        )
+
+        # Sentiment keywords compiled into one alternation; a single
+        # C-level scan classifies the emotion via the matched group name
+        self._sent_re = re.compile(
+            r"(?P<happy>happy|great|excellent|glad|joy)|"
+            r"(?P<sad>sad|sorry|unhappy|unfortunate)|"
+            r"(?P<angry>angry|mad|furious|upset)|"
+            r"(?P<confused>confused|unclear|don't understand)",
+            re.IGNORECASE
+        )
+
+    def _tts_worker(self):
+        """Worker thread that plays queued utterances one at a time"""
+        while True:
+            text, on_done = self._tts_q.get()
+            try:
+                self.engine.say(text)
+                self.engine.runAndWait()
+                if on_done:
+                    on_done()
+            except Exception as e:
+                print(f"Error in TTS worker: {e}")
+            finally:
+                self._tts_q.task_done()
+
+    def speak(self, text, on_done=None):
+        """Queue text for speech; returns immediately
+
+        If on_done is given it is called from the TTS worker thread once
+        playback of this utterance finishes.
+        """
+        if self.privacy_mode:
+            print(f"[PRIVACY MODE] {self.name} would say: {text}")
+            if on_done:
+                on_done()
+            return
+
+        print(f"{self.name}: {text}")
+        self._tts_q.put((text, on_done))
+
+    def cancel_speech(self):
+        """Drop queued utterances and interrupt the one being spoken
+
+        Used for barge-in: since speak() only enqueues, callers that
+        want silence now must flush the queue and stop the engine.
+        """
+        try:
+            while True:
+                self._tts_q.get_nowait()
+                self._tts_q.task_done()
+        except queue.Empty:
+            pass
+        try:
+            self.engine.stop()
+        except Exception as e:
+            print(f"Error stopping speech: {e}")
+
+    def listen(self):
+        """Listen for wake word and commands"""
+        self.is_listening = True
+        self.stop_event.clear()
+        
+        print(f"Listening for wake word: 'Hey {self.name}'")
+        
+        # Start background listening thread
+        threading.Thread(target=self._listen_thread, daemon=True).start()
+
+        # Recognition runs on a small pool so transcribing utterance N
+        # overlaps capturing utterance N+1; completed results are
+        # dispatched strictly in capture order via sequence numbers
+        stt_pool = ThreadPoolExecutor(max_workers=2)
+        results = queue.Queue()
+        pending = []  # min-heap of (seq, text) awaiting in-order dispatch
+        next_seq = 0
+        seq = 0
+
+        try:
+            while not self.stop_event.is_set():
+                try:
+                    audio_data = self.audio_queue.get(timeout=0.5)
+                    stt_pool.submit(self._recognize_job, seq, audio_data, results)
+                    seq += 1
+                except queue.Empty:
+                    pass
+                except KeyboardInterrupt:
+                    self.stop_event.set()
+                    break
+
+                # Drain finished recognitions and dispatch in capture order
+                while True:
+                    try:
+                        heapq.heappush(pending, results.get_nowait())
+                    except queue.Empty:
+                        break
+                while pending and pending[0][0] == next_seq:
+                    _, text = heapq.heappop(pending)
+                    next_seq += 1
+                    if text:
+                        self._dispatch_recognized(text)
+        finally:
+            stt_pool.shutdown(wait=False)
+
+        self.is_listening = False
+        print(f"{self.name} has stopped listening.")
+
+    def _listen_thread(self):
+        """Background thread to capture audio"""
+        with sr.Microphone() as source:
+            self.recognizer.adjust_for_ambient_noise(source, duration=1)
+
+            # Short exponential backoff on errors: transient glitches
+            # retry in 50ms instead of stalling capture for a second
+            backoff = 0.05
+            while not self.stop_event.is_set():
+                try:
+                    audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=10)
+                    self.audio_queue.put(audio)
+                    backoff = 0.05
+                except sr.WaitTimeoutError:
+                    pass
+                except Exception as e:
+                    print(f"Error in listen thread: {e}")
+                    time.sleep(backoff)
+                    backoff = min(backoff * 2, 1.0)
+
+    def _recognize_job(self, seq, audio, results):
+        """Transcribe one captured blob and report (seq, text) for dispatch"""
+        text = self._recognize_audio(audio)
+        if text:
+            self._maybe_prefetch(text)
+        results.put((seq, text))
+
+    def _maybe_prefetch(self, text):
+        """Start a speculative generation for a recognized utterance
+
+        Dispatch is strictly in capture order, so a transcription that
+        completes out of turn would otherwise sit idle; generating its
+        answer speculatively hides that wait. The result is only used if
+        the dispatched text still matches the speculated prompt.
+        """
+        match = self._wake_re.search(text)
+        if not match:
+            return
+        command = text[match.end():].strip()
+        if not command or self._cmd_re.search(command):
+            return
+
+        # Snapshot the context now, before dispatch appends to history
+        context = (self.system_prefix + "".join(self._context_lines)
+                   + f"{self._user_prefix}{command}\n{self._assist_prefix}")
+        with self._spec_lock:
+            self._spec_prompt = command
+            self._spec_future = self._spec_pool.submit(self._generate_once, context)
+
+    def _generate_once(self, context):
+        """Run one non-streaming generation; returns the answer or None"""
+        try:
+            data = {
+                "model": self.model_name,
+                "prompt": context,
+                "stream": False,
+                "keep_alive": -1,
+                "options": {
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "top_k": 40,
+                    "num_ctx": 2048,
+                    "num_predict": 256,
+                }
+            }
+            response = self._http.post(
+                self.ollama_url, data=_json_dumps(data),
+                headers={"Content-Type": "application/json"}, timeout=30
+            )
+            if response.status_code == 200:
+                return _json_loads(response.content).get("response")
+            return None
+        except Exception:
+            return None
+
+    def _take_speculative(self, user_input):
+        """Claim the speculative answer if it matches this utterance"""
+        with self._spec_lock:
+            prompt, future = self._spec_prompt, self._spec_future
+            self._spec_prompt = None
+            self._spec_future = None
+        if future is None:
+            return None
+        if difflib.SequenceMatcher(None, prompt, user_input).ratio() < 0.9:
+            future.cancel()
+            return None
+        try:
+            return future.result(timeout=30)
+        except Exception:
+            return None
+
+    def _recognize_audio(self, audio):
+        """Run speech recognition on captured audio; returns text or None"""
+        if self._vosk is not None and not self.use_online_stt:
+            try:
+                rec = vosk.KaldiRecognizer(self._vosk, 16000)
+                rec.AcceptWaveform(
+                    audio.get_raw_data(convert_rate=16000, convert_width=2))
+                text = _json_loads(rec.Result()).get("text", "")
+                return text.lower() if text else None
+            except Exception as e:
+                print(f"Error in local recognition: {e}")
+                return None
+
+        try:
+            # Online recognition (more accurate, costs a network round-trip)
+            text = self.recognizer.recognize_google(audio)
+        except:
+            return None
+        return text.lower()
+
+    def _dispatch_recognized(self, text):
+        """Handle one recognized utterance"""
+        print(f"Recognized: {text}")
+
+        # Check for wake word and strip the wake phrase in one pass
+        match = self._wake_re.search(text)
+        if match:
+            command = text[match.end():].strip()
+            self._process_command(command)
+
+    def _process_command(self, command):
+        """Process voice command"""
+        if not command:
+            self.speak("How can I help you?")
+            return
+            
+        # Check for direct command matches
+        match = self._cmd_re.search(command)
+        if match:
+            self.commands[match.group(0)]()
+            return
+
+        # If no direct match, send to LLM
+        self._handle_conversation(command)
+
+    def _format_history_line(self, message):
+        """Format one history message as a context line"""
+        role_prefix = (self._user_prefix if message["role"] == "user"
+                       else self._assist_prefix)
+        return f"{role_prefix}{message['content']}\n"
+
+    def _install_conversation(self, messages):
+        """Swap validated messages in as the history and rebuild context
+
+        Every message is formatted before anything is replaced, so a
+        malformed entry raises here and leaves the current conversation
+        and its context lines untouched and in lockstep.
+        """
+        lines = [self._format_history_line(m) for m in messages]
+        self.conversation_history.clear()
+        self.conversation_history.extend(messages)
+        # The deque drops the oldest entries past maxlen; mirror that
+        self._context_lines = lines[len(lines) - len(self.conversation_history):]
+        self._ctx_chars = sum(len(line) for line in self._context_lines)
+        self._trim_context_to_budget()
+        self._history_json_dirty = True
+
+    def _trim_context_to_budget(self):
+        """Drop oldest turns until the context fits the character budget"""
+        while (self._ctx_chars > self._ctx_char_budget
+               and len(self._context_lines) > 1):
+            self.conversation_history.popleft()
+            self._ctx_chars -= len(self._context_lines.pop(0))
+
+    def _remember(self, role, content):
+        """Append a message to history and the conversation log if enabled"""
+        message = {"role": role, "content": content}
+        if len(self.conversation_history) == self.max_context_length:
+            # The deque is about to drop its oldest entry; mirror that
+            self._ctx_chars -= len(self._context_lines.pop(0))
+        self.conversation_history.append(message)
+        line = self._format_history_line(message)
+        self._context_lines.append(line)
+        self._ctx_chars += len(line)
+        self._trim_context_to_budget()
+        self._history_json_dirty = True
+        if self.log_path:
+            self.append_message_to_log(self.log_path, message)
+
+    def _handle_conversation(self, user_input):
+        """Process conversation with LLM
+
+        Streams the response and speaks each completed sentence, so the
+        first words are audible while the rest is still generating
+        instead of waiting out the full generation plus full synthesis.
+        """
+        # Add user message to history
+        self._remember("user", user_input)
+
+        # Reuse the speculative answer if one was prefetched for this turn
+        answer = self._take_speculative(user_input)
+        if answer is not None:
+            self.speak(answer)
+            self._remember("assistant", answer)
+            return
+
+        buffer = ""
+        parts = []
+        for token in self.query_llm_stream(user_input):
+            parts.append(token)
+            buffer += token
+            match = _SENTENCE_END_RE.search(buffer)
+            if match and len(buffer.strip()) >= 10:
+                self.speak(buffer[:match.end()].strip())
+                buffer = buffer[match.end():]
+
+        # Speak any trailing partial sentence
+        if buffer.strip():
+            self.speak(buffer.strip())
+
+        # Add assistant response to history
+        self._remember("assistant", "".join(parts))
+
+    def _build_context(self):
+        """Build the prompt context from conversation history
+
+        The system prefix comes first and history is appended in arrival
+        order, never re-ordered, so the prompt grows monotonically and
+        stays KV-cache friendly. Callers append the current user message
+        to history before querying, so only the assistant cue is added
+        here.
+        """
+        return self.system_prefix + "".join(self._context_lines) + self._assist_prefix
+
+    def query_llm(self, prompt):
+        """Send prompt to Ollama LLM and get response"""
+        try:
+            # Give the startup probe a brief chance to finish first
+            self._llm_ready.wait(timeout=0.1)
+
+            # Check the semantic cache before paying for a generation
+            q_emb = self._embed(prompt)
+            if q_emb is not None:
+                cached = self._semantic_cache_lookup(q_emb)
+                if cached is not None:
+                    return cached
+
+            context = self._build_context()
+
+            # Prepare request for Ollama
+            data = {
+                "model": self.model_name,
+                "prompt": context,
+                "stream": False,
+                "keep_alive": -1,  # Keep the model and its KV cache resident
+                "options": {
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "top_k": 40,
+                    "num_ctx": 2048,
+                    "num_predict": 256,  # Limit response length to save resources
+                }
+            }
+            
+            # Send request
+            response = self._http.post(
+                self.ollama_url, data=_json_dumps(data),
+                headers={"Content-Type": "application/json"}, timeout=30
+            )
+
+            if response.status_code == 200:
+                result = _json_loads(response.content)
+                answer = result.get("response", "I'm sorry, I couldn't process that request.")
+                if q_emb is not None:
+                    self._semantic_cache_store(q_emb, prompt, answer)
+                return answer
+            else:
+                print(f"LLM request failed with status code: {response.status_code}")
+                return "I'm having trouble connecting to my brain right now."
+        
+        except requests.exceptions.RequestException as e:
+            print(f"Error communicating with Ollama: {e}")
+            return "I'm having trouble connecting to my language model. Is Ollama running?"
+        except Exception as e:
+            print(f"Unexpected error in LLM query: {e}")
+            return "I encountered an unexpected error. Please try again."
+
+    def query_llm_stream(self, prompt):
+        """Send prompt to Ollama LLM and yield response tokens as they arrive"""
+        try:
+            context = self._build_context()
+
+            # Prepare streaming request for Ollama
+            data = {
+                "model": self.model_name,
+                "prompt": context,
+                "stream": True,
+                "keep_alive": -1,  # Keep the model and its KV cache resident
+                "options": {
+                    "temperature": 0.7,
+                    "top_p": 0.9,
+                    "top_k": 40,
+                    "num_ctx": 2048,
+                    "num_predict": 256,  # Limit response length to save resources
+                }
+            }
+
+            response = self._http.post(
+                self.ollama_url, data=_json_dumps(data),
+                headers={"Content-Type": "application/json"},
+                timeout=30, stream=True
+            )
+
+            if response.status_code != 200:
+                print(f"LLM request failed with status code: {response.status_code}")
+                yield "I'm having trouble connecting to my brain right now."
+                return
+
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                chunk = _json_loads(line)
+                token = chunk.get("response", "")
+                if token:
+                    yield token
+                if chunk.get("done"):
+                    break
+
+        except requests.exceptions.RequestException as e:
+            print(f"Error communicating with Ollama: {e}")
+            yield "I'm having trouble connecting to my language model. Is Ollama running?"
+        except Exception as e:
+            print(f"Unexpected error in LLM query: {e}")
+            yield "I encountered an unexpected error. Please try again."
+
+    def analyze_sentiment(self, text):
+        """Simple rule-based sentiment analysis to detect emotion"""
+        # This is a very basic implementation
+        # In a production system, you might use a proper NLP model
+        match = self._sent_re.search(text)
+        return match.lastgroup if match else "neutral"
+
+    # Command Functions
+    def tell_time(self):
+        """Tell the current time"""
+        current_time = datetime.now().strftime("%I:%M %p")
+        self.speak(f"The current time is {current_time}")
+
+    def tell_story(self):
+        """Generate a short story using the LLM"""
+        self.speak("Let me think of a story for you...")
+        story_prompt = "Generate a short, engaging story (less than 100 words)"
+        self._remember("user", story_prompt)
+        story = self.query_llm(story_prompt)
+        self._remember("assistant", story)
+        self.speak(story)
+
+    def toggle_privacy(self):
+        """Toggle privacy mode on/off"""
+        self.privacy_mode = not self.privacy_mode
+        if self.privacy_mode:
+            self.speak("Privacy shield activated. I'll be more discreet.")
+        else:
+            self.speak("Privacy shield deactivated. Normal operations resumed.")
+
+    def stop_listening(self):
+        """Stop the assistant from listening"""
+        self.speak("Goodbye. Going offline now.")
+        # Let the goodbye finish playing before shutting down
+        self._tts_q.join()
+        self.stop_event.set()
+
+    def show_help(self):
+        """Show available commands"""
+        help_text = "Here are some commands you can use: "
+        for i, cmd in enumerate(self.commands.keys()):
+            if i > 0:
+                help_text += ", "
+            help_text += cmd
+        self.speak(help_text)
+    
+    def process_text_input(self, text):
+        """Process text input from GUI"""
+        if not text:
+            return "Please enter a message."
+            
+        # Add to conversation history
+        self._remember("user", text)
+
+        # Check for direct commands
+        match = self._cmd_re.search(text.lower())
+        if match:
+            self.commands[match.group(0)]()
+            return f"Command '{match.group(0)}' executed."
+
+        # Get response from LLM
+        response = self.query_llm(text)
+
+        # Add to conversation history
+        self._remember("assistant", response)
+
+        return response
+
+    def process_text_input_stream(self, text):
+        """Process text input from GUI, yielding response tokens as they arrive"""
+        if not text:
+            yield "Please enter a message."
+            return
+
+        # Add to conversation history
+        self._remember("user", text)
+
+        # Check for direct commands
+        match = self._cmd_re.search(text.lower())
+        if match:
+            self.commands[match.group(0)]()
+            yield f"Command '{match.group(0)}' executed."
+            return
+
+        # Stream response from LLM, keeping the full text for history
+        parts = []
+        for token in self.query_llm_stream(text):
+            parts.append(token)
+            yield token
+
+        self._remember("assistant", "".join(parts))
+
+    def save_conversation(self, filepath):
+        """Save conversation history to a file"""
+        try:
+            if self._history_json_dirty or self._history_json_cache is None:
+                history = list(self.conversation_history)
+                if orjson is not None:
+                    self._history_json_cache = orjson.dumps(
+                        history, option=orjson.OPT_INDENT_2)
+                else:
+                    self._history_json_cache = json.dumps(
+                        history, indent=2).encode("utf-8")
+                self._history_json_dirty = False
+            with open(filepath, 'wb') as f:
+                f.write(self._history_json_cache)
+            return True
+        except Exception as e:
+            print(f"Error saving conversation: {e}")
+            return False
+
+    def append_message_to_log(self, filepath, message):
+        """Append one message to a length-prefixed binary conversation log
+
+        Each record is a 4-byte little-endian length followed by the
+        JSON-encoded message, so persisting a new turn is an O(1) append
+        instead of re-serializing the whole history.
+        """
+        try:
+            payload = _json_dumps(message)
+            with open(filepath, 'ab') as f:
+                f.write(struct.pack('<I', len(payload)) + payload)
+            return True
+        except Exception as e:
+            print(f"Error appending to conversation log: {e}")
+            return False
+
+    def load_conversation_mmap(self, filepath):
+        """Load conversation history from a length-prefixed binary log
+
+        Reads through a read-only mmap so records are parsed straight out
+        of the page cache without an intermediate read buffer.
+        """
+        try:
+            if not os.path.exists(filepath):
+                return False
+            if os.path.getsize(filepath) == 0:
+                self._install_conversation([])
+                return True
+
+            messages = []
+            with open(filepath, 'rb') as f:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    offset = 0
+                    size = mm.size()
+                    while offset + 4 <= size:
+                        (length,) = struct.unpack_from('<I', mm, offset)
+                        offset += 4
+                        messages.append(_json_loads(mm[offset:offset + length]))
+                        offset += length
+                finally:
+                    mm.close()
+
+            self._install_conversation(messages)
+            return True
+        except Exception as e:
+            print(f"Error loading conversation log: {e}")
+            return False
+
+    def load_conversation(self, filepath):
+        """Load conversation history from a file"""
+        try:
+            if os.path.exists(filepath):
+                with open(filepath, 'rb') as f:
+                    loaded_history = _json_loads(f.read())
+                # Formats (and thereby validates) every entry before the
+                # current history is replaced
+                self._install_conversation(loaded_history)
+                return True
+            return False
+        except Exception as e:
+            print(f"Error loading conversation: {e}")
+            return False
+
+
+# If run directly, start FRIDAY in voice mode
+if __name__ == "__main__":
+    try:
+        friday = FridayCore()
+        friday.listen()
+    except KeyboardInterrupt:
+        print("\nShutting down FRIDAY...")
+    except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
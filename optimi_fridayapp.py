@@ -1,16 +1,88 @@
+from __future__ import annotations
+
 import os
 import sys
+import mmap
 import time
+import asyncio
+import weakref
 import threading
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
-from PIL import Image, ImageTk # Keep if you plan to use images, otherwise remove
 from datetime import datetime
+from array import array
+from collections import deque, namedtuple
+from itertools import islice
+from operator import itemgetter
+from contextlib import contextmanager
 import math
 from functools import partial
 from typing import Callable, Optional, Union, List, Dict, Any
+import gzip
 import json
 
+# orjson encodes and parses multi-MB transcripts several times faster
+# than the stdlib json module; fall back to json when it is missing
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson stream-parses large transcripts in constant memory; fall back
+# to a one-shot parse when it is not installed
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# fastjsonschema code-generates a validator specialized to the history
+# schema at import time; the manual checks remain as the fallback
+try:
+    import fastjsonschema
+    HISTORY_SCHEMA = {
+        "type": "array",
+        "items": {
+            "type": "object",
+            "required": ["role", "content"],
+            "properties": {
+                "role": {"type": "string"},
+                "content": {"type": "string"},
+            },
+        },
+    }
+    _validate_history = fastjsonschema.compile(HISTORY_SCHEMA)
+except ImportError:
+    fastjsonschema = None
+    _validate_history = None
+
+# PIL is only needed to pre-render button images; it is imported lazily
+# on first CustomButton construction so its decoder/plugin registry does
+# not tax application cold start
+Image = ImageTk = ImageDraw = None
+
+def _ensure_pil():
+    global Image, ImageTk, ImageDraw
+    if Image is None:
+        from PIL import Image, ImageTk, ImageDraw
+
+def _open_history_file(filepath: str, mode: str):
+    """Open a chat-history file, gzipping transparently when compressed.
+
+    Writes compress when the name ends in .gz (level 1: most of the
+    ratio at a fraction of the CPU of the default level). Reads sniff
+    the gzip magic bytes so renamed files still load.
+    """
+    if mode == 'wb':
+        if filepath.endswith('.gz'):
+            return gzip.open(filepath, 'wb', compresslevel=1)
+        return open(filepath, 'wb')
+    f = open(filepath, 'rb')
+    if f.read(2) == b'\x1f\x8b':
+        f.close()
+        return gzip.open(filepath, 'rb')
+    f.seek(0)
+    return f
+
 # Import the core module
 from friday_core import FridayCore
 
@@ -18,6 +90,28 @@ from friday_core import FridayCore
 APP_VERSION = "1.1 Optimized"
 FONT_PRIMARY = "Consolas" # Changed from Arial for more 'tech' feel
 FONT_SANS = "Helvetica" # For some UI elements
+TYPING_CHARS_PER_SEC = 150 # Typing-effect pace (matches old 3 chars / 20 ms)
+TYPING_TICK_MS = 33 # Typing-effect driver rate (~30 Hz)
+MAX_CHAT_HISTORY = 10_000 # Bound on in-memory history entries
+HISTORY_LOAD_BATCH = 50 # Entries appended per event-loop turn when loading
+RENDER_WINDOW = 200 # Entries rendered per window when loading history
+
+# Slim history records: roles map to small ints and each entry is a
+# (role_id, content, timestamp) tuple instead of a per-turn dict
+ROLE_IDS = {"user": 0, "assistant": 1, "system": 2}
+ROLE_NAMES = {v: k for k, v in ROLE_IDS.items()}
+ROLE_LABELS = {"user": sys.intern("You:"),
+               "assistant": sys.intern("FRIDAY:")} # Display prefixes
+
+_basename = os.path.basename # Resolved once; used in save/load messages
+
+# Byte-coded worker results: the UI pump dispatches on the small int
+# kind through a handler table, so the worker allocates one tuple per
+# outcome instead of a closure per UI update
+Result = namedtuple('Result', 'kind payload')
+RESULT_OK = 0
+RESULT_ERR = 1
+RESULT_SPEAK_DONE = 2
 
 # --- Theme ---
 class Theme:
@@ -40,6 +134,9 @@ THEME = Theme() # Global theme instance
 # --- Custom Widgets ---
 class CustomButton(tk.Canvas):
     """Multi-purpose custom button with animations and distinct shapes."""
+
+    _SS = 4 # Supersampling factor for the pre-rendered state images
+
     def __init__(self, parent, text: str, command: Callable,
                  width: int = 120, height: int = 40, shape: str = "rect",
                  icon: Optional[str] = None, **kwargs): # icon can be a unicode char
@@ -69,8 +166,42 @@ class CustomButton(tk.Canvas):
         self.border_color = kwargs.get('border', self.theme.accent)
         self.active_toggle_color = kwargs.get('active_color', self.theme.highlight) # For active toggle state
 
+        _ensure_pil()
+
+        # Hexagon vertices depend only on the fixed size; compute the
+        # trig once instead of per render
+        if self.shape == "hex":
+            self._hex_points = self._compute_hex_points(self._SS)
+
+        # Pre-render every visual state once; a state change is then a
+        # single itemconfig image swap instead of rebuilding polygons,
+        # text and accent lines on each mouse transition
+        self._state_images = {
+            state: ImageTk.PhotoImage(self._render_state(state))
+            for state in ("normal", "hover", "pressed", "toggle_active")
+        }
+        if self.shape == "hex":
+            self._text_colors = {
+                "normal": self.theme.text, "hover": "#ffffff",
+                "pressed": "#ffffff", "toggle_active": "#ffffff",
+            }
+            text_font = (FONT_SANS, 12,
+                         "bold" if self.display_text and len(self.display_text) == 1 else "normal")
+        else:
+            self._text_colors = {
+                "normal": self.base_fg, "hover": self.hover_fg,
+                "pressed": self.hover_fg, "toggle_active": "#ffffff",
+            }
+            text_font = (FONT_SANS, 10, "bold")
+
+        self._img_id = self.create_image(0, 0, anchor=tk.NW,
+                                         image=self._state_images["normal"])
+        self._text_id = self.create_text(self.width / 2, self.height / 2,
+                                         text=self.display_text,
+                                         fill=self._text_colors["normal"],
+                                         font=text_font)
         self._draw()
-        
+
         self.bind("<Enter>", self._on_hover)
         self.bind("<Leave>", self._on_leave)
         self.bind("<Button-1>", self._on_press)
@@ -102,93 +233,121 @@ class CustomButton(tk.Canvas):
             self.is_toggle_active = active
             self._draw()
 
+    def _current_state(self) -> str:
+        if self.is_toggle_active:
+            return "toggle_active"
+        if self.pressed:
+            return "pressed"
+        if self.hovered:
+            return "hover"
+        return "normal"
+
     def _draw(self):
-        self.delete("all")
+        state = self._current_state()
+        self.itemconfig(self._img_id, image=self._state_images[state])
+        self.itemconfig(self._text_id, fill=self._text_colors[state])
+
+    def _compute_hex_points(self, ss: int) -> List[tuple]:
+        cx, cy = self.width * ss / 2, self.height * ss / 2
+        r = min(cx, cy) - 4 * ss # Padding
+        points = []
+        for i in range(6):
+            angle_deg = 60 * i - 30 # Rotated for flat top/bottom
+            angle_rad = math.radians(angle_deg)
+            points.append((cx + r * math.cos(angle_rad), cy + r * math.sin(angle_rad)))
+        return points
+
+    def _render_state(self, state: str) -> Image.Image:
+        """Render one visual state, supersampled for anti-aliasing."""
+        ss = self._SS
+        img = Image.new("RGBA", (self.width * ss, self.height * ss), (0, 0, 0, 0))
+        draw = ImageDraw.Draw(img)
         if self.shape == "rect":
-            self._draw_rect()
-        elif self.shape == "hex":
-            self._draw_hex()
-
-    def _create_rounded_rect(self, x1, y1, x2, y2, radius, **kwargs):
-        points = [
-            x1 + radius, y1, x2 - radius, y1,
-            x2, y1, x2, y1 + radius, x2, y2 - radius, x2, y2,
-            x2 - radius, y2, x1 + radius, y2,
-            x1, y2, x1, y2 - radius, x1, y1 + radius, x1, y1
-        ]
-        return self.create_polygon(points, smooth=True, **kwargs)
+            self._render_rect(draw, state, ss)
+        else:
+            self._render_hex(draw, state, ss)
+        return img.resize((self.width, self.height), Image.LANCZOS)
 
-    def _draw_rect(self):
+    def _render_rect(self, draw: ImageDraw.ImageDraw, state: str, ss: int):
         current_bg = self.base_bg
-        current_fg = self.base_fg
         border_w = 1
-        
-        if self.is_toggle_active:
+
+        if state == "toggle_active":
             current_bg = self.active_toggle_color
-            current_fg = "#ffffff"
             border_w = 2
-        elif self.pressed:
-            current_bg = self.hover_bg # Use hover_bg for pressed state, or a dedicated pressed_bg
-            current_fg = self.hover_fg
-            border_w = 2
-        elif self.hovered:
+        elif state in ("pressed", "hover"):
             current_bg = self.hover_bg
-            current_fg = self.hover_fg
             border_w = 2
-        
+
         # Main button body
-        self._create_rounded_rect(2, 2, self.width - 2, self.height - 2, 8,
-                                  fill=current_bg, outline=self.border_color, width=border_w)
-        
-        # Text
-        self.create_text(self.width / 2, self.height / 2, text=self.display_text,
-                         fill=current_fg, font=(FONT_SANS, 10, "bold"))
-        
+        draw.rounded_rectangle(
+            [2 * ss, 2 * ss, (self.width - 2) * ss, (self.height - 2) * ss],
+            radius=8 * ss, fill=current_bg,
+            outline=self.border_color, width=border_w * ss
+        )
+
         # Tech accents on hover (simplified)
-        if self.hovered and not self.pressed and not self.is_toggle_active:
-            accent_size = 5
+        if state == "hover":
+            accent_size = 5 * ss
             accent_color = self.theme.accent
             # Top-left
-            self.create_line(3, 3, 3 + accent_size, 3, fill=accent_color, width=1)
-            self.create_line(3, 3, 3, 3 + accent_size, fill=accent_color, width=1)
+            draw.line([3 * ss, 3 * ss, 3 * ss + accent_size, 3 * ss], fill=accent_color, width=ss)
+            draw.line([3 * ss, 3 * ss, 3 * ss, 3 * ss + accent_size], fill=accent_color, width=ss)
             # Bottom-right
-            self.create_line(self.width - 3, self.height - 3, self.width - 3 - accent_size, self.height - 3, fill=accent_color, width=1)
-            self.create_line(self.width - 3, self.height - 3, self.width - 3, self.height - 3 - accent_size, fill=accent_color, width=1)
-
-    def _draw_hex(self):
-        cx, cy = self.width / 2, self.height / 2
-        r = min(cx, cy) - 4 # Padding
-        points = []
-        for i in range(6):
-            angle_deg = 60 * i - 30 # Rotated for flat top/bottom
-            angle_rad = math.radians(angle_deg)
-            points.extend([cx + r * math.cos(angle_rad), cy + r * math.sin(angle_rad)])
+            bx, by = (self.width - 3) * ss, (self.height - 3) * ss
+            draw.line([bx, by, bx - accent_size, by], fill=accent_color, width=ss)
+            draw.line([bx, by, bx, by - accent_size], fill=accent_color, width=ss)
 
+    def _render_hex(self, draw: ImageDraw.ImageDraw, state: str, ss: int):
         current_fill = self.base_bg
         current_outline = self.base_fg
         outline_width = 1
-        text_color = self.theme.text
 
-        if self.is_toggle_active:
+        if state == "toggle_active":
             current_fill = self.active_toggle_color
             current_outline = "#ffffff"
             outline_width = 2
-            text_color = "#ffffff"
-        elif self.pressed:
+        elif state == "pressed":
             current_fill = self.theme.accent # Brighter when pressed
             current_outline = self.active_toggle_color
-            text_color = "#ffffff"
-        elif self.hovered:
+        elif state == "hover":
             current_fill = self.hover_bg
             current_outline = self.active_toggle_color
             outline_width = 2
-            text_color = "#ffffff"
-            
-        self.create_polygon(points, fill=current_fill, outline=current_outline, width=outline_width)
-        
-        if self.display_text:
-            self.create_text(cx, cy, text=self.display_text, fill=text_color,
-                             font=(FONT_SANS, 12, "bold" if len(self.display_text) == 1 else "normal"))
+
+        draw.polygon(self._hex_points, fill=current_fill,
+                     outline=current_outline, width=outline_width * ss)
+
+
+class _AnimationDriver:
+    """One shared after() timer driving every active PulsingIndicator.
+
+    Multiple repeating Tk timers each cost an event-loop wakeup; a single
+    50 ms tick advances all registered indicators at once and stops
+    rescheduling when none are active.
+    """
+    def __init__(self):
+        self._indicators = weakref.WeakSet()
+        self._job = None
+
+    def register(self, indicator: "PulsingIndicator"):
+        self._indicators.add(indicator)
+        if self._job is None:
+            self._job = indicator.after(50, self._tick)
+
+    def unregister(self, indicator: "PulsingIndicator"):
+        self._indicators.discard(indicator)
+
+    def _tick(self):
+        self._job = None
+        active = [ind for ind in self._indicators if ind.is_pulsing]
+        for indicator in active:
+            indicator._advance()
+        if active:
+            self._job = active[0].after(50, self._tick)
+
+
+_ANIMATION_DRIVER = _AnimationDriver()
 
 
 class PulsingIndicator(tk.Canvas):
@@ -202,11 +361,15 @@ class PulsingIndicator(tk.Canvas):
         self.pulse_radius = 0
         self.max_pulse_radius = size // 2
         self.is_pulsing = False
-        self.animation_job = None
         self._draw_static()
 
+        # Pulse ring created once and hidden; the animation mutates its
+        # coordinates instead of recreating the item every frame
+        cx, cy = self.size / 2, self.size / 2
+        self.create_oval(cx, cy, cx, cy, outline=self.pulse_color,
+                         width=2, state='hidden', tags="pulse")
+
     def _draw_static(self):
-        self.delete("pulse")
         self.delete("core")
         core_radius = self.size // 4
         cx, cy = self.size / 2, self.size / 2
@@ -214,44 +377,43 @@ class PulsingIndicator(tk.Canvas):
                            cx + core_radius, cy + core_radius,
                            fill=self.base_color, outline="", tags="core")
 
-    def _draw_pulse(self):
-        self.delete("pulse")
-        if not self.is_pulsing:
-            return
-
+    def _update_pulse(self):
         cx, cy = self.size / 2, self.size / 2
+        r = self.pulse_radius
         # Simple expanding ring, no complex alpha needed for Tkinter
         # Opacity can be simulated by color choice if desired (e.g., lighter pulse_color)
-        self.create_oval(cx - self.pulse_radius, cy - self.pulse_radius,
-                           cx + self.pulse_radius, cy + self.pulse_radius,
-                           outline=self.pulse_color, width=2, tags="pulse")
+        self.coords("pulse", cx - r, cy - r, cx + r, cy + r)
 
     def start(self):
         if not self.is_pulsing:
             self.is_pulsing = True
             self.pulse_radius = self.size // 4 # Start from core size
-            self._animate()
+            self._update_pulse()
+            self.itemconfig("pulse", state='normal')
+            _ANIMATION_DRIVER.register(self)
 
     def stop(self):
         if self.is_pulsing:
             self.is_pulsing = False
-            if self.animation_job:
-                self.after_cancel(self.animation_job)
-                self.animation_job = None
-            self._draw_static() # Reset to static core
-
-    def _animate(self):
-        if not self.is_pulsing:
-            return
+            _ANIMATION_DRIVER.unregister(self)
+            self.itemconfig("pulse", state='hidden') # Back to static core
 
+    def _advance(self):
+        """Advance one animation frame; called by the shared driver."""
         self.pulse_radius += 1
         if self.pulse_radius > self.max_pulse_radius:
             self.pulse_radius = self.size // 4 # Reset pulse
+        self._update_pulse()
 
-        self._draw_pulse()
-        self.animation_job = self.after(50, self._animate)
+    def set_visible(self, visible: bool):
+        """Show or hide the indicator without geometry-manager churn."""
+        if not visible:
+            self.stop()
+        self.itemconfig("core", state='normal' if visible else 'hidden')
 
     def set_color(self, color: str):
+        if color == self.base_color:
+            return
         self.base_color = color
         self.itemconfig("core", fill=self.base_color)
 
@@ -265,7 +427,63 @@ class FridayApp:
         
         self.voice_active = False
         self.privacy_mode = False # Not fully implemented, but state is tracked
-        self.chat_history: List[Dict[str, Any]] = []
+        # Columnar history: typed role/timestamp arrays plus a content
+        # list, so scans and filters walk contiguous C buffers instead of
+        # chasing per-entry dict pointers
+        self._hist_roles = array('b')
+        self._hist_ts = array('d')
+        self._hist_content: List[str] = []
+
+        # One long-lived worker loop replaces spawning a thread per query;
+        # work is submitted with run_coroutine_threadsafe and results are
+        # marshalled back to Tk via root.after
+        self._worker_loop = asyncio.new_event_loop()
+        threading.Thread(target=self._worker_loop.run_forever, daemon=True).start()
+
+        # Coalesced UI updates: workers append callables (deque.append is
+        # atomic) and a single ~16 ms pump runs them on the Tk thread in
+        # one batch instead of one after(0) event per update
+        self._ui_queue: deque = deque()
+        self._closing = False # Set just before the root is destroyed
+        self._result_handlers = {
+            RESULT_OK: self._render_ok_result,
+            RESULT_ERR: self._render_err_result,
+            RESULT_SPEAK_DONE: self._render_speak_done,
+        }
+        self.root.after(16, self._drain_ui_queue)
+
+        # Message timestamps display minute resolution, so the formatted
+        # string is cached and refreshed at most every 30 s
+        self._cached_timestamp = ("", 0.0)
+
+        # Scroll-position probe for the typing animation, refreshed at
+        # most once per second
+        self._at_bottom = True
+        self._at_bottom_checked = 0.0
+
+        # At most one typing animation runs at a time; a new one
+        # fast-forwards the generator still in flight
+        self._typing_gen = None
+        self._typing_after_id: Optional[str] = None
+        self._typing_finish_now = False
+
+        # Settings dialog is created on first open and reused after
+        self._settings_win: Optional[tk.Toplevel] = None
+
+        self._last_status = ""
+
+        # Parsed chat-history files keyed by path -> (mtime, entries);
+        # reopening an unchanged file skips the parse entirely
+        self._chat_cache: Dict[str, tuple] = {}
+
+        # Append-only JSONL saves: the file last written and how many
+        # entries it already holds, so later saves write only the delta
+        self._jsonl_path: Optional[str] = None
+        self._last_saved_index = 0
+
+        # Index of the oldest history entry currently rendered in the
+        # chat display; entries before it materialize on scroll-up
+        self._render_start = 0
 
         self._configure_root_window()
         self._setup_ui()
@@ -363,6 +581,14 @@ class FridayApp:
         # Style scrollbar (less intrusive)
         self.chat_display.vbar.configure(width=8, troughcolor=self.theme.bg, bg=self.theme.input_bg,
                                          activebackground=self.theme.accent, relief=tk.FLAT)
+        # Loaded histories render lazily: scrolling near the top pulls
+        # in the next window of older entries. Dragging the scrollbar
+        # fires no wheel event, so the scroll position itself is watched
+        # through yscrollcommand as well.
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>", "<Prior>"):
+            self.chat_display.bind(seq, self._on_chat_scroll, add="+")
+        self._scroll_probe_armed = False
+        self.chat_display.config(yscrollcommand=self._on_scroll_position)
 
         # Input area
         input_area = tk.Frame(main_area, bg=self.theme.bg, height=60)
@@ -370,7 +596,10 @@ class FridayApp:
 
         self.voice_status_indicator = PulsingIndicator(input_area, size=25, base_color=self.theme.error,
                                                        pulse_color=self.theme.error, bg=self.theme.bg)
-        # self.voice_status_indicator.pack(side=tk.LEFT, padx=(0, 10)) # Packed when voice active
+        # Packed once; toggling voice mode shows/hides the canvas items
+        # instead of re-running the geometry manager
+        self.voice_status_indicator.pack(side=tk.LEFT, padx=(0, 10))
+        self.voice_status_indicator.set_visible(False)
 
         input_field_container = tk.Frame(input_area, bg=self.theme.accent, bd=1) # Similar border
         input_field_container.pack(side=tk.LEFT, fill=tk.X, expand=True)
@@ -402,17 +631,22 @@ class FridayApp:
 
     def _configure_text_tags(self):
         """Configure tags for styling messages in the chat display."""
+        # Settings shared by both bubbles are parsed once into a base tag;
+        # the bubble tags only add their differing colors, margins and
+        # justification on top
+        self.chat_display.tag_configure("_msg_base",
+                                        font=(FONT_PRIMARY, 11),
+                                        relief=tk.RAISED, borderwidth=1,
+                                        spacing1=2, spacing3=2, # Spacing around paragraph
+                                        wrap=tk.WORD)
+
         # User message
         self.chat_display.tag_configure("user_timestamp", foreground="#999", font=(FONT_PRIMARY, 8))
         self.chat_display.tag_configure("user_bubble",
                                         background=self.theme.user_msg_bg,
                                         foreground="#ffffff",
-                                        font=(FONT_PRIMARY, 11),
-                                        relief=tk.RAISED, borderwidth=1,
                                         lmargin1=100, rmargin=10, # lmargin1 for indent, rmargin for space from right
-                                        justify=tk.RIGHT,
-                                        spacing1=2, spacing3=2, # Spacing around paragraph
-                                        wrap=tk.WORD)
+                                        justify=tk.RIGHT)
         self.chat_display.tag_configure("user_label", foreground=self.theme.accent, font=(FONT_PRIMARY, 10, "bold"),
                                         lmargin1=100, rmargin=10, justify=tk.RIGHT)
 
@@ -422,11 +656,7 @@ class FridayApp:
         self.chat_display.tag_configure("assistant_bubble",
                                         background=self.theme.assistant_msg_bg,
                                         foreground=self.theme.text,
-                                        font=(FONT_PRIMARY, 11),
-                                        relief=tk.RAISED, borderwidth=1,
-                                        lmargin1=10, rmargin=100, # rmargin for space from right
-                                        spacing1=2, spacing3=2,
-                                        wrap=tk.WORD)
+                                        lmargin1=10, rmargin=100) # rmargin for space from right
         self.chat_display.tag_configure("assistant_label", foreground=self.theme.highlight, font=(FONT_PRIMARY, 10, "bold"),
                                         lmargin1=10, rmargin=100)
         
@@ -442,67 +672,151 @@ class FridayApp:
                                         justify=tk.CENTER,
                                         spacing1=5, spacing3=5)
 
-    def _append_message_to_display(self, role: str, text: str, label: Optional[str] = None):
+    def _now_str(self) -> str:
+        text, ts = self._cached_timestamp
+        now = time.monotonic()
+        if not text or now - ts >= 30.0:
+            text = datetime.now().strftime("%I:%M %p")
+            self._cached_timestamp = (text, now)
+        return text
+
+    @contextmanager
+    def _editable(self):
+        """Temporarily make the chat display writable for one batch of edits."""
         self.chat_display.config(state=tk.NORMAL)
-        timestamp = datetime.now().strftime("%I:%M %p")
-        
-        if self.chat_display.index('end-1c') != "\n": # Add newline if not first message or prev not newline
-             self.chat_display.insert(tk.END, "\n")
+        try:
+            yield
+        finally:
+            self.chat_display.config(state=tk.DISABLED)
 
+    def _message_display_args(self, role: str, text: str, label: Optional[str] = None) -> List[Any]:
+        timestamp = self._now_str()
+
+        # Build interleaved (text, tags, ...) arguments so the whole
+        # message goes into the widget with one insert call — a single
+        # Text invalidation instead of one per fragment
+        args: List[Any] = []
         if role == "user":
-            if label: self.chat_display.insert(tk.END, f"{label} ", ("user_label",))
-            self.chat_display.insert(tk.END, f"{text}\n", ("user_bubble",))
-            self.chat_display.insert(tk.END, f"{timestamp} ", ("user_timestamp", "user_label")) # Align timestamp with label
+            if label: args += [f"{label} ", ("user_label",)]
+            args += [f"{text}\n", ("_msg_base", "user_bubble"),
+                     f"{timestamp} ", ("user_timestamp", "user_label")] # Align timestamp with label
         elif role == "assistant":
-            if label: self.chat_display.insert(tk.END, f"{label} ", ("assistant_label",))
+            if label: args += [f"{label} ", ("assistant_label",)]
             # Placeholder for typing effect if re-added
-            self.chat_display.insert(tk.END, f"{text}\n", ("assistant_bubble",))
-            self.chat_display.insert(tk.END, f"{timestamp} ", ("assistant_timestamp", "assistant_label"))
+            args += [f"{text}\n", ("_msg_base", "assistant_bubble"),
+                     f"{timestamp} ", ("assistant_timestamp", "assistant_label")]
         elif role == "system":
-            self.chat_display.insert(tk.END, f"{text}\n", ("system_message",))
+            args += [f"{text}\n", ("system_message",)]
         elif role == "error":
-             self.chat_display.insert(tk.END, f"{text}\n", ("error_message",))
+            args += [f"{text}\n", ("error_message",)]
+        args += ["\n", ()] # Extra space after message block
+        return args
 
-        self.chat_display.insert(tk.END, "\n") # Extra space after message block
+    def _append_message_to_display(self, role: str, text: str, label: Optional[str] = None):
+        args = self._message_display_args(role, text, label)
+        with self._editable():
+            if self.chat_display.index('end-1c') != "\n": # Add newline if not first message or prev not newline
+                args = ["\n", ()] + args
+            self.chat_display.insert(tk.END, *args)
+        self.chat_display.see(tk.END)
+
+    def _display_message_with_typing_effect(self, message: str):
+        """Displays assistant message with a typing animation.
+
+        A fixed-rate driver computes how many characters should be
+        visible from a monotonic clock and inserts the delta in a single
+        call per tick, instead of one after() hop and a NORMAL/DISABLED
+        toggle per few characters.
+        """
+        # A message may arrive while the previous one is still typing;
+        # finish that one first so only one pump chain is ever armed
+        self._finish_active_typing()
+        self.chat_display.config(state=tk.NORMAL)
+        if self.chat_display.index('end-1c') != "\n":
+            self.chat_display.insert(tk.END, "\n")
+        self.chat_display.insert(tk.END, "FRIDAY ", ("assistant_label",))
+        # Store start position of actual message content for later tagging
+        self._typing_message_start_index = self.chat_display.index(tk.END)
+        # The widget stays NORMAL for the whole animation; it is disabled
+        # again when typing finishes. A generator keeps the animation
+        # state in one reusable frame and the pump callback is a bound
+        # method, so no closures are allocated per tick.
+        self._typing_gen = self._typing_steps(message)
+        self._pump_typing()
+
+    def _maybe_autoscroll(self):
+        """Follow the typing animation only if the user is at the bottom.
+
+        see(END) walks the Text widget's line cache each call, so the
+        scroll-position check is cached and refreshed at most once per
+        second while the animation runs.
+        """
+        now = time.monotonic()
+        if now - self._at_bottom_checked >= 1.0:
+            self._at_bottom_checked = now
+            self._at_bottom = self.chat_display.yview()[1] > 0.99
+        if self._at_bottom:
+            self.chat_display.see(tk.END)
+
+    def _typing_steps(self, message: str):
+        """Generator advancing the typing animation one tick per resume."""
+        started = time.perf_counter()
+        shown = 0
+        while shown < len(message):
+            if self._typing_finish_now:
+                target = len(message) # Fast-forward: show the rest at once
+            else:
+                elapsed = time.perf_counter() - started
+                target = min(len(message), int(elapsed * TYPING_CHARS_PER_SEC))
+            if target > shown:
+                self.chat_display.insert(tk.END, message[shown:target]) # No tag yet, apply at end
+                self._maybe_autoscroll()
+                shown = target
+            if shown < len(message):
+                yield
+
+        # Typing finished: apply the bubble tags to the whole message typed
+        end_index = self.chat_display.index(tk.END)
+        self.chat_display.tag_add("_msg_base", self._typing_message_start_index, end_index)
+        self.chat_display.tag_add("assistant_bubble", self._typing_message_start_index, end_index)
+
+        # Add timestamp
+        timestamp = self._now_str()
+        self.chat_display.insert(tk.END, f"\n{timestamp} ", ("assistant_timestamp", "assistant_label"))
+        self.chat_display.insert(tk.END, "\n\n")
         self.chat_display.config(state=tk.DISABLED)
         self.chat_display.see(tk.END)
+        self.processing_indicator.stop()
+        self.update_status("Ready.")
 
-    def _display_message_with_typing_effect(self, message: str, index: int = 0):
-        """Displays assistant message with a typing animation."""
-        chunk_size = 3  # Characters per update
-        typing_delay = 20  # Milliseconds
+    def _pump_typing(self):
+        try:
+            next(self._typing_gen)
+        except StopIteration:
+            self._typing_gen = None
+            self._typing_after_id = None
+            return
+        self._typing_after_id = self.root.after(TYPING_TICK_MS, self._pump_typing)
 
-        if index == 0: # First call for this message
-            self.chat_display.config(state=tk.NORMAL)
-            timestamp = datetime.now().strftime("%I:%M %p")
-            if self.chat_display.index('end-1c') != "\n":
-                 self.chat_display.insert(tk.END, "\n")
-            self.chat_display.insert(tk.END, "FRIDAY ", ("assistant_label",))
-            # Store start position of actual message content for later tagging
-            self._typing_message_start_index = self.chat_display.index(tk.END)
-            self.chat_display.config(state=tk.DISABLED)
+    def _finish_active_typing(self):
+        """Complete any in-flight typing animation immediately.
 
-        if index < len(message):
-            self.chat_display.config(state=tk.NORMAL)
-            display_chunk = message[index : index + chunk_size]
-            self.chat_display.insert(tk.END, display_chunk) # No tag yet, apply at end
-            self.chat_display.config(state=tk.DISABLED)
-            self.chat_display.see(tk.END)
-            self.root.after(typing_delay, lambda: self._display_message_with_typing_effect(message, index + chunk_size))
-        else: # Typing finished
-            self.chat_display.config(state=tk.NORMAL)
-            # Apply the bubble tag to the whole message typed
-            end_index = self.chat_display.index(tk.END)
-            self.chat_display.tag_add("assistant_bubble", self._typing_message_start_index, end_index)
-            
-            # Add timestamp
-            timestamp = datetime.now().strftime("%I:%M %p")
-            self.chat_display.insert(tk.END, f"\n{timestamp} ", ("assistant_timestamp", "assistant_label"))
-            self.chat_display.insert(tk.END, "\n\n")
-            self.chat_display.config(state=tk.DISABLED)
-            self.chat_display.see(tk.END)
-            self.processing_indicator.stop()
-            self.update_status("Ready.")
+        Cancels the pending tick and runs the generator to completion so
+        the interrupted message still gets its full text, bubble tags and
+        timestamp before the next animation starts.
+        """
+        gen, self._typing_gen = self._typing_gen, None
+        if gen is None:
+            return
+        if self._typing_after_id is not None:
+            self.root.after_cancel(self._typing_after_id)
+            self._typing_after_id = None
+        self._typing_finish_now = True
+        try:
+            for _ in gen:
+                pass
+        finally:
+            self._typing_finish_now = False
 
     def display_user_message(self, message: str):
         self._append_message_to_display("user", message, "You:")
@@ -516,43 +830,102 @@ class FridayApp:
     def display_system_message(self, message: str, is_error: bool = False):
         self._append_message_to_display("error" if is_error else "system", message)
 
+    def _record_history(self, role: str, content: str):
+        self._hist_roles.append(ROLE_IDS.get(role, ROLE_IDS["system"]))
+        self._hist_content.append(content)
+        self._hist_ts.append(time.time())
+        if len(self._hist_roles) > MAX_CHAT_HISTORY:
+            # Drop the oldest tenth in one slice rather than per-append pops
+            cut = MAX_CHAT_HISTORY // 10
+            del self._hist_roles[:cut]
+            del self._hist_ts[:cut]
+            del self._hist_content[:cut]
+            # Keep the append-only JSONL bookmark and the rendered-range
+            # start pointing at the same entries
+            self._last_saved_index = max(0, self._last_saved_index - cut)
+            self._render_start = max(0, self._render_start - cut)
+
+    def _iter_history_dicts(self):
+        """Reconstruct dict records lazily for serialization and replay."""
+        for role_id, content, ts in zip(self._hist_roles, self._hist_content,
+                                        self._hist_ts):
+            yield {"role": ROLE_NAMES[role_id], "content": content, "time": ts}
+
     def _on_send_message(self, event: Optional[tk.Event] = None):
         user_text = self.user_input_var.get().strip()
         if not user_text:
             return
 
         self.display_user_message(user_text)
-        self.chat_history.append({"role": "user", "content": user_text, "time": time.time()})
+        self._record_history("user", user_text)
         self.user_input_var.set("")
         self.processing_indicator.start()
         self.update_status("FRIDAY is thinking...")
 
-        # Process in a thread to keep UI responsive
-        threading.Thread(target=self._process_user_query, args=(user_text,), daemon=True).start()
+        # Process on the worker loop to keep UI responsive
+        asyncio.run_coroutine_threadsafe(self._process_user_query(user_text),
+                                         self._worker_loop)
 
-    def _process_user_query(self, user_text: str):
+    async def _process_user_query(self, user_text: str):
+        # Core calls block the worker loop, which deliberately serializes
+        # queries; the Tk thread stays free throughout
         try:
             response = self.friday_core.process_text_input(user_text)
-            self.chat_history.append({"role": "assistant", "content": response, "time": time.time()})
+            self._record_history("assistant", response)
             # Schedule UI update back on the main thread
-            self.root.after(0, lambda: self.display_assistant_message(response, with_typing=True))
-            
+            self._post_ui(Result(RESULT_OK, response))
+
             if self.voice_active and not self.privacy_mode:
                 # Make speak non-blocking or handle completion
-                self.friday_core.speak(response, on_done=lambda: self.root.after(0, self._on_speech_done))
+                self.friday_core.speak(
+                    response,
+                    on_done=partial(self._post_ui, Result(RESULT_SPEAK_DONE, None)))
         except Exception as e:
             error_msg = f"Core Error: {e}"
             print(f"Error during processing: {error_msg}") # Log to console
-            self.chat_history.append({"role": "system", "content": error_msg, "time": time.time()})
-            self.root.after(0, lambda: self.display_system_message(error_msg, is_error=True))
-            self.root.after(0, self.processing_indicator.stop)
-            self.root.after(0, lambda: self.update_status("Error processing query."))
+            self._record_history("system", error_msg)
+            self._post_ui(Result(RESULT_ERR, error_msg))
+
+    def _post_ui(self, fn: Callable):
+        """Queue a callable to run on the Tk thread at the next pump tick."""
+        self._ui_queue.append(fn)
+
+    def _drain_ui_queue(self):
+        while self._ui_queue:
+            item = self._ui_queue.popleft()
+            try:
+                if isinstance(item, Result):
+                    self._result_handlers[item.kind](item.payload)
+                else:
+                    item()
+            except Exception as e:
+                print(f"UI update error: {e}")
+        # The queued shutdown callable destroys the root; re-arming past
+        # that point would raise TclError on a dead interpreter
+        if not self._closing:
+            self.root.after(16, self._drain_ui_queue)
+
+    def _render_ok_result(self, response: str):
+        self.display_assistant_message(response, with_typing=True)
+
+    def _render_err_result(self, error_msg: str):
+        self.display_system_message(error_msg, is_error=True)
+        self.processing_indicator.stop()
+        self.update_status("Error processing query.")
+
+    def _render_speak_done(self, _payload):
+        self._on_speech_done()
 
     def _on_speech_done(self):
         self.update_status("Speech finished.")
         # Any other actions after speech, if needed
 
     def update_status(self, message: str):
+        # Skip the widget reconfigure when the text is unchanged; voice
+        # mode re-sets the same status repeatedly
+        if message == self._last_status:
+            return
+        self._last_status = message
         self.status_label.config(text=message)
 
     def _activate_chat_view(self):
@@ -566,15 +939,14 @@ class FridayApp:
         self.voice_active = not self.voice_active
         self.voice_button_widget.set_toggle_active(self.voice_active)
         if self.voice_active:
-            self.voice_status_indicator.pack(side=tk.LEFT, padx=(0, 10), before=self.user_input_entry.master.master) # Pack before input container
+            self.voice_status_indicator.set_visible(True)
             self.voice_status_indicator.start()
             self.display_system_message("Voice input/output enabled. FRIDAY is listening...")
             self.update_status("Voice mode: ON - Listening...")
             # Start listening via core
             self.friday_core.start_listening(self._on_voice_detected, self._on_listening_error)
         else:
-            self.voice_status_indicator.stop()
-            self.voice_status_indicator.pack_forget()
+            self.voice_status_indicator.set_visible(False)
             self.display_system_message("Voice input/output disabled.")
             self.update_status("Voice mode: OFF")
             self.friday_core.stop_listening() # Tell core to stop
@@ -583,21 +955,21 @@ class FridayApp:
         """Callback for when FridayCore detects speech."""
         if not self.voice_active: return # Guard if voice was disabled during listen
         
-        self.root.after(0, lambda: self.display_system_message(f"Voice detected: \"{detected_text}\""))
-        self.root.after(0, lambda: self.user_input_var.set(detected_text)) # Populate input field
-        self.root.after(0, self._on_send_message) # Process it like typed input
+        self._post_ui(partial(self.display_system_message, f"Voice detected: \"{detected_text}\""))
+        self._post_ui(partial(self.user_input_var.set, detected_text)) # Populate input field
+        self._post_ui(self._on_send_message) # Process it like typed input
         # Optionally, restart listening or wait for user to re-enable
         # self.root.after(1000, lambda: self.friday_core.start_listening(self._on_voice_detected, self._on_listening_error) if self.voice_active else None)
 
 
     def _on_listening_error(self, error_message: str):
         """Callback for listening errors from FridayCore."""
-        self.root.after(0, lambda: self.display_system_message(f"Voice listening error: {error_message}", is_error=True))
-        self.root.after(0, lambda: self.update_status("Voice listening error."))
+        self._post_ui(partial(self.display_system_message, f"Voice listening error: {error_message}", is_error=True))
+        self._post_ui(partial(self.update_status, "Voice listening error."))
         # Potentially disable voice mode or attempt to restart
         if self.voice_active: # If still meant to be active, try to recover or notify
-            self.root.after(0, self.toggle_voice_mode) # Turn it off to reset UI
-            self.root.after(100, lambda: self.display_system_message("Voice mode automatically disabled due to error.", is_error=True))
+            self._post_ui(self.toggle_voice_mode) # Turn it off to reset UI
+            self._post_ui(partial(self.display_system_message, "Voice mode automatically disabled due to error.", is_error=True))
 
 
     def toggle_privacy_mode(self):
@@ -609,87 +981,345 @@ class FridayApp:
         self.update_status(f"Privacy: {'ON' if self.privacy_mode else 'OFF'}")
 
     def show_settings_dialog(self):
-        # Simple placeholder settings dialog
-        settings_win = tk.Toplevel(self.root)
-        settings_win.title("Settings")
-        settings_win.geometry("300x200")
-        settings_win.configure(bg=self.theme.bg)
-        settings_win.transient(self.root) # Keep on top of main window
-        settings_win.grab_set() # Modal
-
-        tk.Label(settings_win, text="FRIDAY Settings", font=(FONT_SANS, 14, "bold"),
-                 fg=self.theme.accent, bg=self.theme.bg).pack(pady=20)
-        tk.Label(settings_win, text="Settings are not yet implemented.",
-                 fg=self.theme.text, bg=self.theme.bg).pack(pady=10)
-        
-        CustomButton(settings_win, text="Close", command=settings_win.destroy,
-                     width=80, height=35, theme=self.theme).pack(pady=20)
+        # The dialog is built once and hidden on close; reopening just
+        # deiconifies the existing window instead of paying Toplevel
+        # creation and a window-manager roundtrip each time
+        if self._settings_win is None or not self._settings_win.winfo_exists():
+            self._settings_win = tk.Toplevel(self.root)
+            self._settings_win.title("Settings")
+            self._settings_win.geometry("300x200")
+            self._settings_win.configure(bg=self.theme.bg)
+            self._settings_win.transient(self.root) # Keep on top of main window
+            self._settings_win.protocol("WM_DELETE_WINDOW", self._hide_settings_dialog)
+
+            tk.Label(self._settings_win, text="FRIDAY Settings", font=(FONT_SANS, 14, "bold"),
+                     fg=self.theme.accent, bg=self.theme.bg).pack(pady=20)
+            tk.Label(self._settings_win, text="Settings are not yet implemented.",
+                     fg=self.theme.text, bg=self.theme.bg).pack(pady=10)
+
+            CustomButton(self._settings_win, text="Close", command=self._hide_settings_dialog,
+                         width=80, height=35, theme=self.theme).pack(pady=20)
+        else:
+            self._settings_win.deiconify()
+            self._settings_win.lift()
+
+        self._settings_win.grab_set() # Modal
+
+    def _hide_settings_dialog(self):
+        if self._settings_win is not None:
+            self._settings_win.grab_release()
+            self._settings_win.withdraw()
 
 
     def save_chat_history(self):
         filepath = filedialog.asksaveasfilename(
             defaultextension=".json",
-            filetypes=[("JSON Chat History", "*.json"), ("All Files", "*.*")],
+            filetypes=[("JSON Chat History", "*.json"),
+                       ("Compressed JSON Chat History", "*.json.gz"),
+                       ("JSON Lines Chat Log", "*.jsonl"),
+                       ("All Files", "*.*")],
             title="Save Chat As"
         )
         if not filepath:
             return
+        if filepath.endswith(".jsonl"):
+            self.save_chat_history_jsonl(filepath)
+            return
+        # Snapshot on the UI thread; the history columns may keep growing
+        # while the worker encodes and writes
+        history_copy = list(self._iter_history_dicts())
+        threading.Thread(target=self._do_save, args=(filepath, history_copy),
+                         daemon=True).start()
+
+    def _do_save(self, filepath: str, history_copy: List[Dict[str, Any]]):
+        """Encode and write the snapshot; runs on a worker thread."""
+        try:
+            # Encode everything into one buffer and write it with a
+            # single call — per-entry writes each paid a syscall (and a
+            # compressor call for .gz files)
+            if orjson is not None:
+                parts = [orjson.dumps(entry) for entry in history_copy]
+            else:
+                parts = [json.dumps(entry, separators=(',', ':')).encode('utf-8')
+                         for entry in history_copy]
+            payload = b"[\n" + b",\n".join(parts) + b"\n]"
+            with _open_history_file(filepath, 'wb') as f:
+                f.write(payload)
+            # Success goes to the status bar only — a label config is far
+            # cheaper than a Text-widget insert, which matters when saves
+            # are scripted or frequent
+            self._post_ui(partial(
+                self.update_status,
+                f"Chat saved to {_basename(filepath)}."))
+        except Exception as e:
+            self._post_ui(partial(
+                self.display_system_message, f"Error saving chat: {e}", is_error=True))
+            self._post_ui(partial(self.update_status, "Error saving chat."))
+
+    def save_chat_history_jsonl(self, filepath: str):
+        """Append-only save: one JSON entry per line.
+
+        Re-saving to the same file writes only the entries added since
+        the previous save, so the cost is O(new turns) instead of
+        rewriting the whole transcript each time.
+        """
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.chat_history, f, indent=2)
-            self.display_system_message(f"Chat history saved to {os.path.basename(filepath)}")
-            self.update_status("Chat saved.")
+            if filepath == self._jsonl_path and os.path.exists(filepath):
+                mode, start = 'ab', self._last_saved_index
+            else:
+                mode, start = 'wb', 0
+            total = len(self._hist_content)
+            with open(filepath, mode) as f:
+                for entry in islice(self._iter_history_dicts(), start, None):
+                    if orjson is not None:
+                        f.write(orjson.dumps(entry))
+                    else:
+                        f.write(json.dumps(entry).encode('utf-8'))
+                    f.write(b"\n")
+            self._jsonl_path = filepath
+            self._last_saved_index = total
+            self.update_status(f"Chat saved to {_basename(filepath)}.")
         except Exception as e:
             self.display_system_message(f"Error saving chat: {e}", is_error=True)
             self.update_status("Error saving chat.")
 
     def load_chat_history(self):
         filepath = filedialog.askopenfilename(
-            filetypes=[("JSON Chat History", "*.json"), ("All Files", "*.*")],
+            filetypes=[("JSON Chat History", "*.json"),
+                       ("Compressed JSON Chat History", "*.json.gz"),
+                       ("JSON Lines Chat Log", "*.jsonl"),
+                       ("All Files", "*.*")],
             title="Load Chat From"
         )
         if not filepath:
             return
+        # Loading replaces the whole history, so any earlier append-only
+        # bookmark no longer describes what a .jsonl file holds; the
+        # jsonl load paths re-arm it after installing
+        self._jsonl_path = None
+        self._last_saved_index = 0
         try:
-            with open(filepath, 'r', encoding='utf-8') as f:
-                loaded_history = json.load(f)
-            
-            # Basic validation of loaded history
-            if not isinstance(loaded_history, list) or \
-               not all(isinstance(item, dict) and "role" in item and "content" in item for item in loaded_history):
-                raise ValueError("Invalid chat history format.")
-
-            self.chat_history = loaded_history
-            self.chat_display.config(state=tk.NORMAL)
-            self.chat_display.delete(1.0, tk.END) # Clear current display
-            self.chat_display.config(state=tk.DISABLED)
-
-            for entry in self.chat_history:
-                role = entry.get("role", "system")
-                content = entry.get("content", "")
-                label = "You:" if role == "user" else "FRIDAY:" if role == "assistant" else None
-                self._append_message_to_display(role, content, label)
-            
-            self.display_system_message(f"Chat history loaded from {os.path.basename(filepath)}")
-            self.update_status("Chat loaded.")
+            mtime = os.path.getmtime(filepath)
+            cached = self._chat_cache.get(filepath)
+            if cached is not None and cached[0] == mtime:
+                # Unchanged since last load: entries were validated then
+                self._install_history(filepath, cached[1])
+                if filepath.endswith(".jsonl"):
+                    # The file already holds exactly what was installed
+                    self._jsonl_path = filepath
+                    self._last_saved_index = len(self._hist_content)
+            elif filepath.endswith(".jsonl"):
+                self._load_history_jsonl(filepath, mtime)
+            elif ijson is not None:
+                self._load_history_streaming(filepath, mtime)
+            else:
+                self._load_history_full(filepath, mtime)
         except Exception as e:
             self.display_system_message(f"Error loading chat: {e}", is_error=True)
             self.update_status("Error loading chat.")
 
+    def _load_history_full(self, filepath: str, mtime: float):
+        # One-shot parse; only used when ijson is unavailable
+        with _open_history_file(filepath, 'rb') as f:
+            if isinstance(f, gzip.GzipFile) or os.path.getsize(filepath) == 0:
+                # Compressed input has to be inflated into a buffer anyway
+                data = f.read()
+                loaded_history = orjson.loads(data) if orjson is not None else json.loads(data)
+            else:
+                # Parse straight out of the page cache rather than
+                # copying the whole file into a heap buffer first
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                try:
+                    if orjson is not None:
+                        loaded_history = orjson.loads(mm)
+                    else:
+                        loaded_history = json.loads(mm[:]) # stdlib needs a real bytes object
+                finally:
+                    mm.close()
+
+        # Basic validation of loaded history. The compiled schema
+        # validator reports the index of the offending entry; otherwise
+        # map + itemgetter run the per-entry checks in C instead of a
+        # Python-level generator
+        if _validate_history is not None:
+            try:
+                _validate_history(loaded_history)
+            except fastjsonschema.JsonSchemaException as e:
+                raise ValueError(f"Invalid chat history format: {e}")
+        else:
+            try:
+                if not isinstance(loaded_history, list) or \
+                   not all(map(dict.__instancecheck__, loaded_history)):
+                    raise TypeError
+                list(map(itemgetter("role", "content"), loaded_history))
+            except (KeyError, TypeError):
+                raise ValueError("Invalid chat history format.")
+
+        self._chat_cache[filepath] = (mtime, loaded_history)
+        self._install_history(filepath, loaded_history)
+
+    def _load_history_jsonl(self, filepath: str, mtime: float):
+        entries: List[Dict[str, Any]] = []
+        with _open_history_file(filepath, 'rb') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                entry = orjson.loads(line) if orjson is not None else json.loads(line)
+                if not (isinstance(entry, dict) and "role" in entry and "content" in entry):
+                    raise ValueError("Invalid chat history format.")
+                entries.append(entry)
+        self._chat_cache[filepath] = (mtime, entries)
+        self._install_history(filepath, entries)
+        # Later saves to this file only need to append what comes next
+        self._jsonl_path = filepath
+        self._last_saved_index = len(self._hist_content)
+
+    def _load_history_streaming(self, filepath: str, mtime: float):
+        # Entries are tokenized one at a time in constant memory; each
+        # event-loop turn parses one batch and reschedules itself so the
+        # UI stays responsive. The current history stays untouched until
+        # the whole file has parsed and validated.
+        f = _open_history_file(filepath, 'rb')
+        entries = ijson.items(f, 'item')
+        seen: List[Dict[str, Any]] = [] # For install and the parsed-history cache
+
+        def _pump():
+            try:
+                appended = 0
+                for entry in entries:
+                    if not (isinstance(entry, dict) and "role" in entry and "content" in entry):
+                        raise ValueError("Invalid chat history format.")
+                    seen.append(entry)
+                    appended += 1
+                    if appended >= HISTORY_LOAD_BATCH:
+                        self.root.after_idle(_pump)
+                        return
+                f.close()
+                self._chat_cache[filepath] = (mtime, seen)
+                self._install_history(filepath, seen)
+            except Exception as e:
+                f.close()
+                self.display_system_message(f"Error loading chat: {e}", is_error=True)
+                self.update_status("Error loading chat.")
+
+        _pump()
+
+    def _install_history(self, filepath: str, entries: List[Dict[str, Any]]):
+        """Swap validated entries in as the history and render the tail.
+
+        Called only once a load has fully parsed and validated, so a bad
+        file never costs the user their current transcript.
+        """
+        entries = entries[-MAX_CHAT_HISTORY:]
+        roles = array('b')
+        ts = array('d')
+        content: List[str] = []
+        for entry in entries:
+            # Every parsed entry carries its own copy of one of three
+            # role strings; interning collapses them to shared objects
+            # (and makes later equality checks pointer compares) in the
+            # cached lists
+            role = entry["role"] = sys.intern(entry.get("role", "system"))
+            roles.append(ROLE_IDS.get(role, ROLE_IDS["system"]))
+            ts.append(float(entry.get("time", 0.0)))
+            content.append(entry.get("content", ""))
+        self._hist_roles = roles
+        self._hist_ts = ts
+        self._hist_content = content
+
+        with self._editable():
+            self.chat_display.delete(1.0, tk.END) # Clear current display
+        # Render only the newest window; older entries materialize when
+        # the user scrolls up towards them
+        self._render_start = max(0, len(content) - RENDER_WINDOW)
+        self._flush_display_batch(self._entry_range_args(self._render_start, None))
+        self.chat_display.see(tk.END)
+        # One idle-task flush for the whole load; success is reported in
+        # the status bar rather than as another Text-widget insert
+        self.chat_display.update_idletasks()
+        self.update_status(f"Chat loaded from {_basename(filepath)}.")
+
+    def _entry_range_args(self, start: int, stop: Optional[int]) -> List[Any]:
+        """Display args for history entries [start:stop] in one batch."""
+        batch_args: List[Any] = []
+        for entry in islice(self._iter_history_dicts(), start, stop):
+            role = entry["role"]
+            batch_args += self._message_display_args(
+                role, entry["content"], ROLE_LABELS.get(role))
+        return batch_args
+
+    def _flush_display_batch(self, batch_args: List[Any]):
+        # One NORMAL/insert/DISABLED cycle for the whole batch; tags ride
+        # along in the variadic insert arguments. No see() per entry —
+        # _install_history scrolls once at the end.
+        if not batch_args:
+            return
+        with self._editable():
+            if self.chat_display.index('end-1c') != "\n":
+                batch_args = ["\n", ()] + batch_args
+            self.chat_display.insert(tk.END, *batch_args)
+
+    def _on_chat_scroll(self, event=None):
+        if self._render_start > 0 and self.chat_display.yview()[0] < 0.05:
+            self.root.after_idle(self._render_older_entries)
+
+    def _on_scroll_position(self, first, last):
+        """yscrollcommand hook: update the scrollbar, then probe once idle"""
+        self.chat_display.vbar.set(first, last)
+        # Coalesce to one probe per event-loop turn; probing from inside
+        # the insert that moved the view would recurse
+        if not self._scroll_probe_armed:
+            self._scroll_probe_armed = True
+            self.root.after_idle(self._scroll_probe)
+
+    def _scroll_probe(self):
+        self._scroll_probe_armed = False
+        self._on_chat_scroll()
+
+    def _render_older_entries(self):
+        """Materialize the next window of older entries above the viewport."""
+        if self._render_start <= 0:
+            return
+        start = max(0, self._render_start - RENDER_WINDOW)
+        batch_args = self._entry_range_args(start, self._render_start)
+        self._render_start = start
+        if not batch_args:
+            return
+        # Anchor the viewport to the line it was on before the insert
+        # shifted everything down
+        top_line = int(self.chat_display.index("@0,0").split('.')[0])
+        inserted_lines = sum(s.count("\n") for s in batch_args[0::2])
+        with self._editable():
+            self.chat_display.insert("1.0", *batch_args)
+        self.chat_display.see(f"{top_line + inserted_lines}.0")
 
     def _on_closing(self):
-        if messagebox.askokcancel("Quit FRIDAY", "Are you sure you want to exit FRIDAY?"):
+        if not messagebox.askokcancel("Quit FRIDAY", "Are you sure you want to exit FRIDAY?"):
+            return
+        # Hide the window immediately; stopping the listener can block
+        # for seconds draining microphone buffers, and the window should
+        # not linger while that happens
+        self.root.withdraw()
+        threading.Thread(target=self._shutdown_and_destroy, daemon=True).start()
+
+    def _shutdown_and_destroy(self):
+        """Blocking teardown off the UI thread, then destroy the root."""
+        try:
             if self.friday_core.is_listening:
                 self.friday_core.stop_listening()
+        finally:
+            self._worker_loop.call_soon_threadsafe(self._worker_loop.stop)
             # Any other cleanup tasks
-            self.root.destroy()
+            self._post_ui(self._destroy_root)
+
+    def _destroy_root(self):
+        # Runs on the UI pump; the flag stops the pump from re-arming
+        # after the interpreter is gone
+        self._closing = True
+        self.root.destroy()
 
 if __name__ == "__main__":
-    if sys.version_info < (3, 7):
-        messagebox.showerror("Unsupported Python Version",
-                             "FRIDAY requires Python 3.7 or newer. Please upgrade your Python.")
-        sys.exit(1)
-        
     main_root = tk.Tk()
     app = FridayApp(main_root)
     main_root.mainloop()
\ No newline at end of file